@@ -3,20 +3,29 @@ Alerts: Telegram Bot & Message Formatting
 UPDATED: Include VWAP score, OI strength, deep analysis info
 """
 
+import asyncio
 import logging
+from string import Formatter
 
 try:
     from telegram import Bot
-    from telegram.error import TelegramError
+    from telegram.error import TelegramError, RetryAfter
+    from telegram.request import HTTPXRequest
     TELEGRAM_AVAILABLE = True
 except ImportError:
     TELEGRAM_AVAILABLE = False
 
-from config import TELEGRAM_ENABLED, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from config import (TELEGRAM_ENABLED, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
+                    TELEGRAM_BATCH_WINDOW, TELEGRAM_MAX_MESSAGE_LEN, TELEGRAM_MAX_RATE,
+                    MIN_OI_5M_FOR_ENTRY, MIN_OI_15M_FOR_ENTRY, ATM_OI_THRESHOLD,
+                    VOL_SPIKE_MULTIPLIER, PREMIUM_SL_PERCENT, MIN_CONFIDENCE,
+                    WARMUP_MINUTES, SCAN_INTERVAL)
 from utils import setup_logger
 
 logger = setup_logger("alerts")
 
+BATCH_SEPARATOR = "\n\n---\n\n"
+
 
 # ==================== Telegram Bot ====================
 class TelegramBot:
@@ -27,6 +36,12 @@ class TelegramBot:
         self.bot = None
         self.chat_id = TELEGRAM_CHAT_ID
         
+        # Outgoing queue drained by a background flusher (started on first send)
+        self._queue = asyncio.Queue()
+        self._flusher = None
+        self._carry = None
+        self._last_send = 0.0
+        
         if self.enabled:
             if not TELEGRAM_AVAILABLE:
                 logger.warning("⚠️ python-telegram-bot not installed")
@@ -36,40 +51,135 @@ class TelegramBot:
                 self.enabled = False
             else:
                 try:
-                    self.bot = Bot(token=TELEGRAM_BOT_TOKEN)
+                    # Pooled keep-alive connections - no TLS handshake per alert
+                    request = HTTPXRequest(connection_pool_size=8, connect_timeout=5, read_timeout=10)
+                    self.bot = Bot(token=TELEGRAM_BOT_TOKEN, request=request)
                     logger.info("✅ Telegram initialized")
                 except Exception as e:
                     logger.error(f"❌ Telegram init failed: {e}")
                     self.enabled = False
     
-    async def send(self, message, parse_mode='HTML'):
-        """Send message"""
+    async def send(self, message, parse_mode='HTML', urgent=False):
+        """
+        Queue message - the flusher coalesces bursts into batched sends
+        message may be a str or a zero-arg callable, rendered only when enabled
+        urgent messages skip the batch window and go out on their own
+        """
         if not self.enabled or not self.bot:
             return False
         
+        if callable(message):
+            message = message()
+        
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        
+        self._queue.put_nowait((self.chat_id, message, parse_mode, urgent))
+        return True
+    
+    async def close(self):
+        """Flush pending messages, stop the flusher and release the pool"""
+        if self._flusher is not None:
+            if not self._flusher.done():
+                await self._queue.join()
+                self._flusher.cancel()
+            self._flusher = None
+        
+        if self.bot:
+            try:
+                await self.bot.shutdown()
+            except Exception as e:
+                logger.error(f"❌ Telegram shutdown failed: {e}")
+    
+    async def _next_message(self, timeout=None):
+        """Next queued message (carried-over one first), None on timeout"""
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        
+        if timeout is None:
+            return await self._queue.get()
+        
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=parse_mode
-            )
-            return True
-        except TelegramError as e:
-            logger.error(f"❌ Telegram send failed: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"❌ Unexpected error: {e}")
-            return False
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def _flush_loop(self):
+        """Collect messages for TELEGRAM_BATCH_WINDOW, join and send as one"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            chat_id, text, parse_mode, urgent = await self._next_message()
+            parts = [text]
+            size = len(text)
+            taken = 1
+            # Urgent message: no window - send it as soon as the pacing allows
+            deadline = loop.time() + (0 if urgent else TELEGRAM_BATCH_WINDOW)
+            
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                
+                item = await self._next_message(remaining)
+                if item is None:
+                    break
+                
+                taken += 1
+                
+                # Urgent, different target/mode or over the size limit - next batch
+                next_size = size + len(BATCH_SEPARATOR) + len(item[1])
+                if item[3] or item[0] != chat_id or item[2] != parse_mode or next_size > TELEGRAM_MAX_MESSAGE_LEN:
+                    self._carry = item
+                    taken -= 1
+                    break
+                
+                parts.append(item[1])
+                size = next_size
+            
+            try:
+                await self._deliver(chat_id, BATCH_SEPARATOR.join(parts), parse_mode)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+    
+    async def _deliver(self, chat_id, text, parse_mode, attempts=3):
+        """Send one message, paced to TELEGRAM_MAX_RATE and honoring retry_after"""
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(attempts):
+            wait = self._last_send + 1.0 / TELEGRAM_MAX_RATE - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_send = loop.time()
+            
+            try:
+                await self.bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode=parse_mode
+                )
+                return True
+            except RetryAfter as e:
+                logger.warning(f"⚠️ Telegram rate limit, retry in {e.retry_after}s ({attempt+1}/{attempts})")
+                await asyncio.sleep(e.retry_after)
+            except TelegramError as e:
+                logger.error(f"❌ Telegram send failed: {e}")
+                return False
+            except Exception as e:
+                logger.error(f"❌ Unexpected error: {e}")
+                return False
+        
+        return False
     
     async def send_signal(self, message):
-        """Send entry signal alert"""
-        formatted = f"🔔 <b>TRADING SIGNAL</b>\n\n{message}"
-        return await self.send(formatted)
+        """Send entry signal alert (urgent - never held for batching)"""
+        return await self.send(lambda: f"🔔 <b>TRADING SIGNAL</b>\n\n{_render(message)}", urgent=True)
     
     async def send_exit(self, message):
-        """Send exit alert"""
-        formatted = f"🚪 <b>EXIT SIGNAL</b>\n\n{message}"
-        return await self.send(formatted)
+        """Send exit alert (urgent - never held for batching)"""
+        return await self.send(lambda: f"🚪 <b>EXIT SIGNAL</b>\n\n{_render(message)}", urgent=True)
     
     async def send_update(self, message):
         """Send update"""
@@ -79,126 +189,256 @@ class TelegramBot:
         return self.enabled and self.bot is not None
 
 
-# ==================== Message Formatter ====================
-class MessageFormatter:
-    """Format Telegram messages"""
+def _render(message):
+    """Resolve a lazily formatted message"""
+    return message() if callable(message) else message
+
+
+# ==================== Message Templates ====================
+# Built once at import; formatters only fill in the per-message values
+_SEP = "━" * 20
+_OI_EMOJI = {'strong': '🔥', 'medium': '💪', 'weak': '📊'}
+
+
+def _compile_template(template):
+    """
+    Pre-split a str.format template into (literal, field, spec) chunks once,
+    so rendering is a plain join without re-parsing the template each call
+    """
+    chunks = [(literal, field, spec or '')
+              for literal, field, spec, _ in Formatter().parse(template)]
     
-    @staticmethod
-    def format_entry_signal(signal):
-        """Format entry signal alert with enhanced info"""
-        emoji = "📈" if signal.signal_type.value == "CE_BUY" else "📉"
-        expiry = " ⚡ <b>EXPIRY DAY</b>" if signal.is_expiry_day else ""
-        
-        # OI strength emoji
-        oi_emoji = "🔥" if signal.oi_strength == 'strong' else "💪" if signal.oi_strength == 'medium' else "📊"
-        
-        msg = f"""
-{emoji} <b>{signal.signal_type.value} SIGNAL</b>{expiry}
+    def render(ns):
+        return ''.join([
+            literal if field is None else literal + format(ns[field], spec)
+            for literal, field, spec in chunks
+        ])
+    
+    return render
+
+
+_ENTRY_TMPL = """
+{emoji} <b>{signal_type} SIGNAL</b>{expiry}
 
-⏰ {signal.timestamp.strftime('%I:%M:%S %p')}
-💯 Confidence: <b>{signal.confidence}%</b>
-{oi_emoji} OI Strength: <b>{signal.oi_strength.upper()}</b>
+⏰ {time}
+💯 Confidence: <b>{confidence}%</b>
+{oi_emoji} OI Strength: <b>{oi_strength}</b>
 
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 📊 <b>ENTRY DETAILS</b>
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 
-Entry: ₹{signal.entry_price:.2f}
-Target: ₹{signal.target_price:.2f} (+{abs(signal.target_price - signal.entry_price):.0f} pts)
-Stop Loss: ₹{signal.stop_loss:.2f} (-{abs(signal.entry_price - signal.stop_loss):.0f} pts)
+Entry: ₹{entry_price:.2f}
+Target: ₹{target_price:.2f} (+{target_pts:.0f} pts)
+Stop Loss: ₹{stop_loss:.2f} (-{sl_pts:.0f} pts)
 
-R:R Ratio: <b>1:{signal.get_rr_ratio():.2f}</b>
+R:R Ratio: <b>1:{rr_ratio:.2f}</b>
 
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 🎯 <b>OPTION INFO</b>
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 
-ATM: {signal.atm_strike}
-Strike: {signal.recommended_strike}
-Premium: ₹{signal.option_premium:.2f}
-Premium SL: ₹{signal.premium_sl:.2f}
+ATM: {atm_strike}
+Strike: {recommended_strike}
+Premium: ₹{option_premium:.2f}
+Premium SL: ₹{premium_sl:.2f}
 
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 📈 <b>ANALYSIS</b>
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 
-VWAP: ₹{signal.vwap:.2f} ({signal.vwap_distance:+.0f} pts)
-VWAP Score: {signal.vwap_score}/100 {'✅' if signal.vwap_score >= 80 else '⚠️'}
-ATR: {signal.atr:.1f}
-PCR: {signal.pcr}
+VWAP: ₹{vwap:.2f} ({vwap_distance:+.0f} pts)
+VWAP Score: {vwap_score}/100 {vwap_mark}
+ATR: {atr:.1f}
+PCR: {pcr:.2f}
 
 OI Changes:
-  5m:  {signal.oi_5m:+.1f}%
-  15m: {signal.oi_15m:+.1f}%
+  5m:  {oi_5m:+.1f}%
+  15m: {oi_15m:+.1f}%
 
-ATM {signal.atm_strike}:
-  CE: {signal.atm_ce_change:+.1f}%
-  PE: {signal.atm_pe_change:+.1f}%
+ATM {atm_strike}:
+  CE: {atm_ce_change:+.1f}%
+  PE: {atm_pe_change:+.1f}%
 
-Volume: {signal.volume_ratio:.1f}x {'🔥' if signal.volume_spike else ''}
-Order Flow: {signal.order_flow:.2f}
+Volume: {volume_ratio:.1f}x {volume_mark}
+Order Flow: {order_flow:.2f}
 
-━━━━━━━━━━━━━━━━━━━━
-✅ Primary: {signal.primary_checks}/3
-🎁 Bonus: {signal.bonus_checks}/9
-"""
-        return msg
-    
-    @staticmethod
-    def format_exit_signal(position, reason, details):
-        """Format exit signal alert"""
-        signal = position.signal
-        profit = position.get_profit_loss()
-        profit_pct = position.get_profit_percent()
-        hold_time = position.get_hold_time_minutes()
-        
-        profit_emoji = "🟢" if profit > 0 else "🔴" if profit < 0 else "⚪"
-        
-        msg = f"""
-{signal.signal_type.value} EXIT
+{sep}
+✅ Primary: {primary_checks}/3
+🎁 Bonus: {bonus_checks}/9
+""".replace('{sep}', _SEP)
+
+_EXIT_TMPL = """
+{signal_type} EXIT
 
-⏰ Time: {position.exit_time.strftime('%I:%M:%S %p')}
+⏰ Time: {time}
 📝 Reason: <b>{reason}</b>
 {details}
 
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 💰 <b>P&L SUMMARY</b>
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 
-Entry: ₹{position.entry_premium:.2f}
-Exit: ₹{position.exit_premium:.2f}
+Entry: ₹{entry_premium:.2f}
+Exit: ₹{exit_premium:.2f}
 
 {profit_emoji} Profit: <b>₹{profit:+.2f} ({profit_pct:+.1f}%)</b>
 ⏱️ Hold Time: {hold_time:.0f} minutes
 
-━━━━━━━━━━━━━━━━━━━━
+{sep}
 📊 <b>POSITION DETAILS</b>
-━━━━━━━━━━━━━━━━━━━━
+{sep}
+
+Strike: {atm_strike}
+Entry Price: ₹{entry_price:.2f}
+Target: ₹{target_price:.2f}
+SL: ₹{stop_loss:.2f}
+""".replace('{sep}', _SEP)
 
-Strike: {signal.atm_strike}
-Entry Price: ₹{signal.entry_price:.2f}
-Target: ₹{signal.target_price:.2f}
-SL: ₹{signal.stop_loss:.2f}
+_UPDATE_TMPL = """
+📊 <b>Position Update</b>
+
+Type: {signal_type}
+Entry: ₹{entry_premium:.2f}
+Current: ₹{current_premium:.2f}
+Peak: ₹{highest_premium:.2f}
+Trail SL: ₹{trailing_sl:.2f}
+
+Unrealized P&L: ₹{unrealized_pl:+.2f} ({unrealized_pct:+.1f}%)
+Hold Time: {hold_time:.0f} min
 """
-        return msg
+
+# Compact startup summary - thresholds are fixed per process, baked in at import
+_STARTUP_TMPL = """
+🚀 <b>NIFTY BOT v{version} STARTED</b>
+Futures: {futures_contract} ({monthly_expiry})
+Options: weekly {weekly_expiry}
+<pre>
+OI 5m/15m  &lt; -%s%% / -%s%%
+ATM OI     &lt; -%s%%
+Vol spike  ≥ %sx
+Prem SL    %s%%
+Min conf   %s%%
+Warmup     %s min
+Scan       %ss
+</pre>
+⏰ {current_time}
+""" % (MIN_OI_5M_FOR_ENTRY, MIN_OI_15M_FOR_ENTRY, ATM_OI_THRESHOLD, VOL_SPIKE_MULTIPLIER,
+       PREMIUM_SL_PERCENT, MIN_CONFIDENCE, WARMUP_MINUTES, SCAN_INTERVAL)
+
+_render_entry = _compile_template(_ENTRY_TMPL)
+_render_exit = _compile_template(_EXIT_TMPL)
+_render_update = _compile_template(_UPDATE_TMPL)
+_render_startup = _compile_template(_STARTUP_TMPL)
+
+
+# ==================== Message Formatter ====================
+class MessageFormatter:
+    """Format Telegram messages"""
+    
+    @staticmethod
+    def format_entry_signal(signal):
+        """Format entry signal alert with enhanced info"""
+        # Fields read more than once - look them up a single time
+        signal_type = signal.signal_type.value
+        entry_price = signal.entry_price
+        target_price = signal.target_price
+        stop_loss = signal.stop_loss
+        oi_strength = signal.oi_strength
+        vwap_score = signal.vwap_score
+        
+        emoji = "📈" if signal_type == "CE_BUY" else "📉"
+        expiry = " ⚡ <b>EXPIRY DAY</b>" if signal.is_expiry_day else ""
+        
+        # OI strength emoji
+        oi_emoji = _OI_EMOJI.get(oi_strength, '📊')
+        
+        return _render_entry({
+            'emoji': emoji,
+            'signal_type': signal_type,
+            'expiry': expiry,
+            'time': signal.timestamp.strftime('%I:%M:%S %p'),
+            'confidence': signal.confidence,
+            'oi_emoji': oi_emoji,
+            'oi_strength': oi_strength.upper(),
+            'entry_price': entry_price,
+            'target_price': target_price,
+            'target_pts': abs(target_price - entry_price),
+            'stop_loss': stop_loss,
+            'sl_pts': abs(entry_price - stop_loss),
+            'rr_ratio': signal.get_rr_ratio(),
+            'atm_strike': signal.atm_strike,
+            'recommended_strike': signal.recommended_strike,
+            'option_premium': signal.option_premium,
+            'premium_sl': signal.premium_sl,
+            'vwap': signal.vwap,
+            'vwap_distance': signal.vwap_distance,
+            'vwap_score': vwap_score,
+            'vwap_mark': '✅' if vwap_score >= 80 else '⚠️',
+            'atr': signal.atr,
+            'pcr': signal.pcr,
+            'oi_5m': signal.oi_5m,
+            'oi_15m': signal.oi_15m,
+            'atm_ce_change': signal.atm_ce_change,
+            'atm_pe_change': signal.atm_pe_change,
+            'volume_ratio': signal.volume_ratio,
+            'volume_mark': '🔥' if signal.volume_spike else '',
+            'order_flow': signal.order_flow,
+            'primary_checks': signal.primary_checks,
+            'bonus_checks': signal.bonus_checks
+        })
+    
+    @staticmethod
+    def format_exit_signal(position, reason, details):
+        """Format exit signal alert"""
+        signal = position.signal
+        profit = position.get_profit_loss()
+        profit_pct = position.get_profit_percent()
+        hold_time = position.get_hold_time_minutes()
+        
+        profit_emoji = "🟢" if profit > 0 else "🔴" if profit < 0 else "⚪"
+        
+        return _render_exit({
+            'signal_type': signal.signal_type.value,
+            'time': position.exit_time.strftime('%I:%M:%S %p'),
+            'reason': reason,
+            'details': details,
+            'entry_premium': position.entry_premium,
+            'exit_premium': position.exit_premium,
+            'profit_emoji': profit_emoji,
+            'profit': profit,
+            'profit_pct': profit_pct,
+            'hold_time': hold_time,
+            'atm_strike': signal.atm_strike,
+            'entry_price': signal.entry_price,
+            'target_price': signal.target_price,
+            'stop_loss': signal.stop_loss
+        })
     
     @staticmethod
     def format_position_update(position, current_premium):
         """Format position update"""
         signal = position.signal
-        unrealized_pl = current_premium - position.entry_premium
-        unrealized_pct = (unrealized_pl / position.entry_premium * 100) if position.entry_premium > 0 else 0
+        entry_premium = position.entry_premium
+        unrealized_pl = current_premium - entry_premium
+        unrealized_pct = (unrealized_pl / entry_premium * 100) if entry_premium > 0 else 0
         
-        msg = f"""
-📊 <b>Position Update</b>
-
-Type: {signal.signal_type.value}
-Entry: ₹{position.entry_premium:.2f}
-Current: ₹{current_premium:.2f}
-Peak: ₹{position.highest_premium:.2f}
-Trail SL: ₹{position.trailing_sl:.2f}
-
-Unrealized P&L: ₹{unrealized_pl:+.2f} ({unrealized_pct:+.1f}%)
-Hold Time: {position.get_hold_time_minutes():.0f} min
-"""
-        return msg
+        return _render_update({
+            'signal_type': signal.signal_type.value,
+            'entry_premium': entry_premium,
+            'current_premium': current_premium,
+            'highest_premium': position.highest_premium,
+            'trailing_sl': position.trailing_sl,
+            'unrealized_pl': unrealized_pl,
+            'unrealized_pct': unrealized_pct,
+            'hold_time': position.get_hold_time_minutes()
+        })
+    
+    @staticmethod
+    def format_startup_compact(ctx):
+        """
+        Short startup notice (~260 chars) - contracts, start time and the key
+        thresholds in one <pre> block
+        ctx: version, futures_contract, monthly_expiry, weekly_expiry, current_time
+        """
+        return _render_startup(ctx)
@@ -3,44 +3,160 @@ Market Analyzers: OI, Volume, Technical, Market Structure
 FIXED: 5 strikes deep analysis, AND logic for unwinding, VWAP validation
 """
 
+import numpy as np
 import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime
-from config import *
+from functools import lru_cache
+from config import (
+    MIN_OI_5M_FOR_ENTRY, MIN_OI_15M_FOR_ENTRY,
+    STRONG_OI_5M_THRESHOLD, STRONG_OI_15M_THRESHOLD,
+    PCR_BULLISH, PCR_BEARISH, VOL_SPIKE_MULTIPLIER,
+    VWAP_STRICT_MODE, VWAP_BUFFER, VWAP_DISTANCE_MAX_ATR_MULTIPLE,
+    ATR_PERIOD, ATR_FALLBACK,
+    EXIT_OI_REVERSAL_THRESHOLD, EXIT_OI_CONFIRMATION_CANDLES, EXIT_OI_SPIKE_THRESHOLD,
+    EXIT_CANDLE_REJECTION_MULTIPLIER,
+    get_deep_analysis_strikes, get_next_weekly_expiry_date
+)
 from utils import IST, setup_logger
 
+# Numba (optional, falls back to NumPy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = setup_logger("analyzers")
 
 
+# Shared default for a missing ATM strike - read-only, never mutate
+_EMPTY_ATM = {
+    'ce_oi': 0,
+    'pe_oi': 0,
+    'ce_vol': 0,
+    'pe_vol': 0,
+    'ce_ltp': 0,
+    'pe_ltp': 0
+}
+
+# Unwinding strength indexed by unwinding + strong (strong implies unwinding)
+_STRENGTH = ('weak', 'medium', 'strong')
+
+# Volume trend indexed by (ratio >= 0.7) + (ratio > 1.3)
+_VOLUME_TREND = ('decreasing', 'stable', 'increasing')
+
+# Sentiment indexed by sign(bullish - bearish); -1 wraps to BEARISH
+_SENTIMENT = ('NEUTRAL', 'BULLISH', 'BEARISH')
+
+
+# ==================== Strike Book ====================
+@dataclass
+class StrikeBook:
+    """
+    Option chain as parallel arrays (structure-of-arrays), sorted by strike
+    Built once per scan - analyzers reduce over columns instead of dicts
+    """
+    strikes: np.ndarray
+    ce_oi: np.ndarray
+    pe_oi: np.ndarray
+    ce_vol: np.ndarray
+    pe_vol: np.ndarray
+    ce_ltp: np.ndarray
+    pe_ltp: np.ndarray
+    
+    @classmethod
+    def from_strike_data(cls, strike_data):
+        """Build from {strike: {'ce_oi', 'pe_oi', ...}} (missing fields = 0)"""
+        keys = sorted(strike_data or ())
+        rows = [strike_data[k] for k in keys]
+        
+        counts = np.array([(d.get('ce_oi', 0), d.get('pe_oi', 0), d.get('ce_vol', 0), d.get('pe_vol', 0))
+                           for d in rows], dtype=np.int64).reshape(-1, 4)
+        ltps = np.array([(d.get('ce_ltp', 0), d.get('pe_ltp', 0))
+                         for d in rows], dtype=np.float64).reshape(-1, 2)
+        
+        return cls(np.array(keys, dtype=np.int64), *counts.T, *ltps.T)
+    
+    @classmethod
+    def from_frame(cls, chain):
+        """Build from a parsed chain frame (strike + field columns) - one cast per column"""
+        chain = chain.sort_values('strike')
+        counts = (chain[f].to_numpy(dtype=np.int64) for f in ('ce_oi', 'pe_oi', 'ce_vol', 'pe_vol'))
+        ltps = (chain[f].to_numpy(dtype=np.float64) for f in ('ce_ltp', 'pe_ltp'))
+        return cls(chain['strike'].to_numpy(dtype=np.int64), *counts, *ltps)
+    
+    def __len__(self):
+        return len(self.strikes)
+    
+    def index_of(self, strike):
+        """Row index of strike, -1 if not in the book"""
+        i = int(np.searchsorted(self.strikes, strike))
+        if i < len(self.strikes) and self.strikes[i] == strike:
+            return i
+        return -1
+    
+    def row(self, strike):
+        """Single strike as a dict (shared read-only default if missing)"""
+        i = self.index_of(strike)
+        if i < 0:
+            return _EMPTY_ATM
+        return {
+            'ce_oi': int(self.ce_oi[i]),
+            'pe_oi': int(self.pe_oi[i]),
+            'ce_vol': int(self.ce_vol[i]),
+            'pe_vol': int(self.pe_vol[i]),
+            'ce_ltp': float(self.ce_ltp[i]),
+            'pe_ltp': float(self.pe_ltp[i])
+        }
+
+
 # ==================== OI Analyzer ====================
 class OIAnalyzer:
     """Open Interest analysis with 5 strikes deep focus"""
     
     @staticmethod
-    def calculate_total_oi(strike_data):
+    def calculate_totals(book):
+        """
+        Total CE/PE OI and CE/PE volume (uses ALL 11 strikes)
+        Returns: (ce_oi, pe_oi, ce_vol, pe_vol)
+        """
+        return (int(book.ce_oi.sum()), int(book.pe_oi.sum()),
+                int(book.ce_vol.sum()), int(book.pe_vol.sum()))
+    
+    @staticmethod
+    def calculate_total_oi(book):
         """Calculate total CE/PE OI (uses ALL 11 strikes)"""
-        if not strike_data:
-            return 0, 0
-        
-        total_ce = sum(d.get('ce_oi', 0) for d in strike_data.values())
-        total_pe = sum(d.get('pe_oi', 0) for d in strike_data.values())
-        
+        total_ce, total_pe, _, _ = OIAnalyzer.calculate_totals(book)
         return total_ce, total_pe
     
     @staticmethod
-    def calculate_deep_analysis_oi(strike_data, atm_strike):
+    def summarize(book):
+        """
+        Totals, PCR and order flow for the whole book
+        Returns: dict with ce_oi, pe_oi, ce_vol, pe_vol, pcr, order_flow
+        """
+        ce_oi, pe_oi, ce_vol, pe_vol = OIAnalyzer.calculate_totals(book)
+        return {
+            'ce_oi': ce_oi,
+            'pe_oi': pe_oi,
+            'ce_vol': ce_vol,
+            'pe_vol': pe_vol,
+            'pcr': OIAnalyzer.calculate_pcr(pe_oi, ce_oi),
+            'order_flow': VolumeAnalyzer.order_flow_ratio(ce_vol, pe_vol)
+        }
+    
+    @staticmethod
+    def calculate_deep_analysis_oi(book, atm_strike):
         """
         Calculate CE/PE OI for DEEP ANALYSIS strikes only (5 strikes)
         ATM ± 2 = 5 strikes where 90% institutional money flows
         """
         deep_strikes = get_deep_analysis_strikes(atm_strike)
         
-        deep_ce = 0
-        deep_pe = 0
-        
-        for strike in deep_strikes:
-            if strike in strike_data:
-                deep_ce += strike_data[strike].get('ce_oi', 0)
-                deep_pe += strike_data[strike].get('pe_oi', 0)
+        mask = np.isin(book.strikes, deep_strikes)
+        deep_ce = int(book.ce_oi[mask].sum())
+        deep_pe = int(book.pe_oi[mask].sum())
         
         return deep_ce, deep_pe, deep_strikes
     
@@ -54,7 +170,7 @@ class OIAnalyzer:
                 return 10.0  # Very high PCR (cap)
         
         pcr = total_pe / total_ce
-        return round(min(pcr, 10.0), 2)  # Cap at 10.0
+        return min(pcr, 10.0)  # Cap at 10.0 - rounded only for display
     
     @staticmethod
     def detect_unwinding(ce_5m, ce_15m, pe_5m, pe_15m):
@@ -63,26 +179,17 @@ class OIAnalyzer:
         This ensures quality signals, not just noise
         """
         # CE unwinding - BOTH 5m AND 15m must show unwinding
-        ce_unwinding = (ce_15m < -MIN_OI_15M_FOR_ENTRY and ce_5m < -MIN_OI_5M_FOR_ENTRY)
-        
-        # Strength based on 15m (primary timeframe)
-        if ce_15m < -STRONG_OI_15M_THRESHOLD and ce_5m < -STRONG_OI_5M_THRESHOLD:
-            ce_strength = 'strong'
-        elif ce_15m < -MIN_OI_15M_FOR_ENTRY and ce_5m < -MIN_OI_5M_FOR_ENTRY:
-            ce_strength = 'medium'
-        else:
-            ce_strength = 'weak'
+        # (bitwise & on bools - no short-circuit branches)
+        ce_unwinding = (ce_15m < -MIN_OI_15M_FOR_ENTRY) & (ce_5m < -MIN_OI_5M_FOR_ENTRY)
+        ce_strong = ce_unwinding & (ce_15m < -STRONG_OI_15M_THRESHOLD) & (ce_5m < -STRONG_OI_5M_THRESHOLD)
         
         # PE unwinding - BOTH 5m AND 15m must show unwinding
-        pe_unwinding = (pe_15m < -MIN_OI_15M_FOR_ENTRY and pe_5m < -MIN_OI_5M_FOR_ENTRY)
+        pe_unwinding = (pe_15m < -MIN_OI_15M_FOR_ENTRY) & (pe_5m < -MIN_OI_5M_FOR_ENTRY)
+        pe_strong = pe_unwinding & (pe_15m < -STRONG_OI_15M_THRESHOLD) & (pe_5m < -STRONG_OI_5M_THRESHOLD)
         
-        # Strength
-        if pe_15m < -STRONG_OI_15M_THRESHOLD and pe_5m < -STRONG_OI_5M_THRESHOLD:
-            pe_strength = 'strong'
-        elif pe_15m < -MIN_OI_15M_FOR_ENTRY and pe_5m < -MIN_OI_5M_FOR_ENTRY:
-            pe_strength = 'medium'
-        else:
-            pe_strength = 'weak'
+        # Strength: weak / medium (unwinding) / strong (unwinding + strong)
+        ce_strength = _STRENGTH[int(ce_unwinding) + int(ce_strong)]
+        pe_strength = _STRENGTH[int(pe_unwinding) + int(pe_strong)]
         
         # Multi-timeframe confirmation (both showing negative)
         multi_tf = (ce_5m < -2.0 and ce_15m < -3.0) or (pe_5m < -2.0 and pe_15m < -3.0)
@@ -96,40 +203,45 @@ class OIAnalyzer:
         }
     
     @staticmethod
-    def get_atm_data(strike_data, atm_strike):
+    def detect_unwinding_bulk(ce_5m, ce_15m, pe_5m, pe_15m):
+        """
+        detect_unwinding over arrays (e.g. per-strike OI changes) in one shot
+        Same AND logic; strengths are indices into ('weak', 'medium', 'strong')
+        """
+        ce_5m, ce_15m = np.asarray(ce_5m, dtype=np.float64), np.asarray(ce_15m, dtype=np.float64)
+        pe_5m, pe_15m = np.asarray(pe_5m, dtype=np.float64), np.asarray(pe_15m, dtype=np.float64)
+        
+        ce_unwinding = (ce_15m < -MIN_OI_15M_FOR_ENTRY) & (ce_5m < -MIN_OI_5M_FOR_ENTRY)
+        ce_strong = ce_unwinding & (ce_15m < -STRONG_OI_15M_THRESHOLD) & (ce_5m < -STRONG_OI_5M_THRESHOLD)
+        pe_unwinding = (pe_15m < -MIN_OI_15M_FOR_ENTRY) & (pe_5m < -MIN_OI_5M_FOR_ENTRY)
+        pe_strong = pe_unwinding & (pe_15m < -STRONG_OI_15M_THRESHOLD) & (pe_5m < -STRONG_OI_5M_THRESHOLD)
+        
+        return {
+            'ce_unwinding': ce_unwinding,
+            'pe_unwinding': pe_unwinding,
+            'ce_strength': ce_unwinding.astype(np.int8) + ce_strong,
+            'pe_strength': pe_unwinding.astype(np.int8) + pe_strong,
+            'multi_timeframe': ((ce_5m < -2.0) & (ce_15m < -3.0)) | ((pe_5m < -2.0) & (pe_15m < -3.0))
+        }
+    
+    @staticmethod
+    def get_atm_data(book, atm_strike):
         """Get ATM strike data (current values only)"""
-        return strike_data.get(atm_strike, {
-            'ce_oi': 0,
-            'pe_oi': 0,
-            'ce_vol': 0,
-            'pe_vol': 0,
-            'ce_ltp': 0,
-            'pe_ltp': 0
-        })
+        return book.row(atm_strike)
     
     @staticmethod
-    def get_atm_oi_changes(strike_data, atm_strike, previous_strike_data=None):
+    def get_atm_oi_changes(book, atm_strike, previous_book=None):
         """
         Get ATM strike data WITH OI change calculations
         Compares current vs previous scan
         """
-        current = strike_data.get(atm_strike, {
-            'ce_oi': 0,
-            'pe_oi': 0,
-            'ce_vol': 0,
-            'pe_vol': 0,
-            'ce_ltp': 0,
-            'pe_ltp': 0
-        })
+        current = book.row(atm_strike)
         
         ce_change_pct = 0.0
         pe_change_pct = 0.0
         
-        if previous_strike_data:
-            previous = previous_strike_data.get(atm_strike, {
-                'ce_oi': 0,
-                'pe_oi': 0
-            })
+        if previous_book:
+            previous = previous_book.row(atm_strike)
             
             # CE OI change
             prev_ce_oi = previous.get('ce_oi', 0)
@@ -160,7 +272,7 @@ class OIAnalyzer:
             'pe_ltp': current.get('pe_ltp', 0),
             'ce_change_pct': round(ce_change_pct, 1),
             'pe_change_pct': round(pe_change_pct, 1),
-            'has_previous_data': previous_strike_data is not None,
+            'has_previous_data': previous_book is not None,
             'atm_strike': atm_strike
         }
     
@@ -170,19 +282,19 @@ class OIAnalyzer:
         Check OI reversal with SUSTAINED building (not single candle spike)
         Requires EXIT_OI_CONFIRMATION_CANDLES consecutive candles
         """
-        if not oi_changes_history or len(oi_changes_history) < EXIT_OI_CONFIRMATION_CANDLES:
+        if oi_changes_history is None or len(oi_changes_history) < EXIT_OI_CONFIRMATION_CANDLES:
             return False, 'none', 0.0, "Insufficient data"
         
         # Get last N candles
-        recent = oi_changes_history[-EXIT_OI_CONFIRMATION_CANDLES:]
-        current = recent[-1]
+        recent = np.asarray(oi_changes_history[-EXIT_OI_CONFIRMATION_CANDLES:], dtype=np.float64)
+        current = float(recent[-1])
         
         # Count sustained building
-        building_count = sum(1 for oi in recent if oi > threshold)
+        building_count = int((recent > threshold).sum())
         
         # Strong reversal: ALL recent candles building
         if building_count >= EXIT_OI_CONFIRMATION_CANDLES:
-            avg_building = sum(recent) / len(recent)
+            avg_building = float(recent.mean())
             strength = 'strong' if avg_building > 5.0 else 'medium'
             return True, strength, avg_building, f"{signal_type} sustained building: {building_count}/{len(recent)} candles"
         
@@ -199,13 +311,9 @@ class VolumeAnalyzer:
     """Volume and order flow analysis"""
     
     @staticmethod
-    def calculate_total_volume(strike_data):
+    def calculate_total_volume(book):
         """Calculate total CE/PE volume (uses ALL 11 strikes)"""
-        if not strike_data:
-            return 0, 0
-        
-        ce_vol = sum(d.get('ce_vol', 0) for d in strike_data.values())
-        pe_vol = sum(d.get('pe_vol', 0) for d in strike_data.values())
+        _, _, ce_vol, pe_vol = OIAnalyzer.calculate_totals(book)
         return ce_vol, pe_vol
     
     @staticmethod
@@ -214,13 +322,17 @@ class VolumeAnalyzer:
         if avg == 0:
             return False, 0.0
         ratio = current / avg
-        return ratio >= VOL_SPIKE_MULTIPLIER, round(ratio, 2)
+        return ratio >= VOL_SPIKE_MULTIPLIER, ratio
     
     @staticmethod
-    def calculate_order_flow(strike_data):
+    def calculate_order_flow(book):
         """Calculate order flow ratio (CE vol / PE vol)"""
-        ce_vol, pe_vol = VolumeAnalyzer.calculate_total_volume(strike_data)
-        
+        ce_vol, pe_vol = VolumeAnalyzer.calculate_total_volume(book)
+        return VolumeAnalyzer.order_flow_ratio(ce_vol, pe_vol)
+    
+    @staticmethod
+    def order_flow_ratio(ce_vol, pe_vol):
+        """Order flow ratio from precomputed CE/PE volume totals"""
         if ce_vol == 0 and pe_vol == 0:
             return 1.0
         elif pe_vol == 0:
@@ -229,12 +341,12 @@ class VolumeAnalyzer:
             return 0.2
         
         ratio = ce_vol / pe_vol
-        return round(max(0.2, min(ratio, 5.0)), 2)
+        return max(0.2, min(ratio, 5.0))
     
     @staticmethod
-    def analyze_volume_trend(df, periods=5):
+    def analyze_volume_trend(candles, periods=5):
         """Analyze volume trend from futures candles"""
-        if df is None or len(df) < periods + 1:
+        if candles is None or len(candles) < periods + 1:
             return {
                 'trend': 'unknown',
                 'avg_volume': 0,
@@ -242,12 +354,12 @@ class VolumeAnalyzer:
                 'ratio': 1.0
             }
         
-        recent = df['volume'].tail(periods + 1)
-        avg = recent.iloc[:-1].mean()
-        current = recent.iloc[-1]
+        v = candles['volume'][-(periods + 1):]
+        avg = v[:-1].mean()
+        current = v[-1]
         ratio = current / avg if avg > 0 else 1.0
         
-        trend = 'increasing' if ratio > 1.3 else 'decreasing' if ratio < 0.7 else 'stable'
+        trend = _VOLUME_TREND[int(ratio >= 0.7) + int(ratio > 1.3)]
         
         return {
             'trend': trend,
@@ -258,33 +370,49 @@ class VolumeAnalyzer:
 
 
 # ==================== Technical Analyzer ====================
+_OHLC = ('open', 'high', 'low', 'close')
+_OHLCV = _OHLC + ('volume',)
+
+
+def _numeric_columns(candles, columns):
+    """Indicator precondition - every field present with a numeric dtype"""
+    names = candles.dtype.names or ()
+    return all(col in names and np.issubdtype(candles.dtype[col], np.number) for col in columns)
+
+
 class TechnicalAnalyzer:
-    """Technical indicators: VWAP, ATR, Candles"""
+    """
+    Technical indicators: VWAP, ATR, Candles
+    Candles are a structured array (data_manager.CANDLE_DTYPE) - field access is a
+    zero-copy strided view and the input is never written to
+    """
     
     @staticmethod
-    def calculate_vwap(df):
+    def calculate_vwap(candles):
         """Calculate VWAP from futures candles"""
-        if df is None or len(df) == 0:
+        if candles is None or len(candles) == 0:
             return None
-        
-        try:
-            df_copy = df.copy()
-            df_copy['typical_price'] = (df_copy['high'] + df_copy['low'] + df_copy['close']) / 3
-            df_copy['vol_price'] = df_copy['typical_price'] * df_copy['volume']
-            df_copy['cum_vol_price'] = df_copy['vol_price'].cumsum()
-            df_copy['cum_volume'] = df_copy['volume'].cumsum()
-            df_copy['vwap'] = df_copy['cum_vol_price'] / df_copy['cum_volume']
-            return round(df_copy['vwap'].iloc[-1], 2)
-        except Exception as e:
-            logger.error(f"❌ VWAP error: {e}")
+        if not _numeric_columns(candles, _OHLCV):
+            logger.error("❌ VWAP error: candles missing numeric OHLCV columns")
             return None
+        
+        # Only the session VWAP is needed, so reduce straight to the
+        # last value instead of building cumulative columns
+        h = candles['high']
+        l = candles['low']
+        c = candles['close']
+        v = candles['volume']
+        tp = (h + l + c) * (1.0 / 3.0)
+        num = np.dot(tp, v)
+        den = v.sum()
+        return round(num / den, 2) if den else None
     
     @staticmethod
     def calculate_vwap_distance(price, vwap):
         """Calculate distance from VWAP"""
         if not vwap or not price:
             return 0
-        return round(price - vwap, 2)
+        return price - vwap
     
     @staticmethod
     def validate_signal_with_vwap(signal_type, spot, vwap, atr):
@@ -303,102 +431,103 @@ class TechnicalAnalyzer:
         else:
             buffer = VWAP_BUFFER
         
+        # Flip sign so "aligned" is positive when price sits on the trade side
+        # (CE: above VWAP, PE: below VWAP) - one code path for both
         if signal_type == "CE_BUY":
-            # CE buy: Price should be near or above VWAP
-            if distance < -buffer:
-                return False, f"Price {abs(distance):.0f} pts below VWAP (too far)", 0
-            elif distance > buffer * 3:
-                return False, f"Price {distance:.0f} pts above VWAP (overextended)", 0
-            else:
-                # Score based on proximity
-                if distance > 0:
-                    score = min(100, 80 + (distance / buffer * 20))
-                else:
-                    score = max(60, 80 - (abs(distance) / buffer * 20))
-                return True, f"VWAP distance OK: {distance:+.0f} pts", int(score)
-        
+            sign, toward, away = 1, "above", "below"
         elif signal_type == "PE_BUY":
-            # PE buy: Price should be near or below VWAP
-            if distance > buffer:
-                return False, f"Price {distance:.0f} pts above VWAP (too far)", 0
-            elif distance < -buffer * 3:
-                return False, f"Price {abs(distance):.0f} pts below VWAP (overextended)", 0
-            else:
-                # Score based on proximity
-                if distance < 0:
-                    score = min(100, 80 + (abs(distance) / buffer * 20))
-                else:
-                    score = max(60, 80 - (distance / buffer * 20))
-                return True, f"VWAP distance OK: {distance:+.0f} pts", int(score)
+            sign, toward, away = -1, "below", "above"
+        else:
+            return False, "Unknown signal type", 0
         
-        return False, "Unknown signal type", 0
+        aligned = sign * distance
+        
+        if aligned < -buffer:
+            return False, f"Price {abs(distance):.0f} pts {away} VWAP (too far)", 0
+        if aligned > buffer * 3:
+            return False, f"Price {abs(distance):.0f} pts {toward} VWAP (overextended)", 0
+        
+        # Score based on proximity: 80 at VWAP, +/-20 per buffer, clamped to 60-100
+        score = max(60, min(100, 80 + 20 * aligned / buffer))
+        return True, f"VWAP distance OK: {distance:+.0f} pts", int(score)
     
     @staticmethod
-    def calculate_atr(df, period=ATR_PERIOD):
-        """Calculate ATR from futures candles"""
-        if df is None or len(df) < period:
+    def calculate_atr(candles, period=ATR_PERIOD):
+        """Calculate ATR from futures candles (Wilder's RMA smoothing)"""
+        if candles is None or len(candles) < period:
             return ATR_FALLBACK
-        
-        try:
-            df_copy = df.copy()
-            df_copy['h_l'] = df_copy['high'] - df_copy['low']
-            df_copy['h_cp'] = abs(df_copy['high'] - df_copy['close'].shift(1))
-            df_copy['l_cp'] = abs(df_copy['low'] - df_copy['close'].shift(1))
-            df_copy['tr'] = df_copy[['h_l', 'h_cp', 'l_cp']].max(axis=1)
-            atr = df_copy['tr'].rolling(window=period).mean().iloc[-1]
-            return round(atr, 2)
-        except Exception as e:
-            logger.error(f"❌ ATR error: {e}")
+        if not _numeric_columns(candles, _OHLC):
+            logger.error("❌ ATR error: candles missing numeric OHLC columns")
             return ATR_FALLBACK
+        
+        h = candles['high']
+        l = candles['low']
+        c = candles['close']
+        
+        # True range; first bar has no prev close, TR = H - L
+        prev = np.empty_like(c)
+        prev[0] = c[0]
+        prev[1:] = c[:-1]
+        tr = np.maximum.reduce([h - l, np.abs(h - prev), np.abs(l - prev)])
+        
+        # RMA = EMA with alpha 1/period (matches TradingView / pandas-ta)
+        atr = pd.Series(tr).ewm(alpha=1.0 / period, adjust=False).mean().iloc[-1]
+        return round(float(atr), 2)
     
     @staticmethod
-    def analyze_candle(df):
+    def analyze_candle(candles):
         """Analyze current candle"""
-        if df is None or len(df) == 0:
+        if candles is None or len(candles) == 0:
+            return TechnicalAnalyzer._empty_candle()
+        if not _numeric_columns(candles, _OHLC):
+            logger.error("❌ Candle error: candles missing numeric OHLC columns")
             return TechnicalAnalyzer._empty_candle()
         
-        try:
-            candle = df.iloc[-1]
-            o, h, l, c = candle['open'], candle['high'], candle['low'], candle['close']
-            
-            total_size = h - l
-            body = abs(c - o)
-            upper_wick = h - max(o, c)
-            lower_wick = min(o, c) - l
-            
-            color = 'GREEN' if c > o else 'RED' if c < o else 'DOJI'
-            
-            rejection = False
-            rejection_type = None
-            
-            if upper_wick > body * EXIT_CANDLE_REJECTION_MULTIPLIER and body > 0:
+        # Last element of each field view
+        o = float(candles['open'][-1])
+        h = float(candles['high'][-1])
+        l = float(candles['low'][-1])
+        c = float(candles['close'][-1])
+        
+        total_size = h - l
+        body = abs(c - o)
+        body_top = o if o >= c else c
+        body_bot = o + c - body_top
+        upper_wick = h - body_top
+        lower_wick = body_bot - l
+        
+        color = 'GREEN' if c > o else 'RED' if c < o else 'DOJI'
+        
+        rejection = False
+        rejection_type = None
+        
+        if body > 0:
+            max_wick = body * EXIT_CANDLE_REJECTION_MULTIPLIER
+            if upper_wick > max_wick:
                 rejection = True
                 rejection_type = 'upper'
-            elif lower_wick > body * EXIT_CANDLE_REJECTION_MULTIPLIER and body > 0:
+            elif lower_wick > max_wick:
                 rejection = True
                 rejection_type = 'lower'
-            
-            return {
-                'color': color,
-                'size': round(total_size, 2),
-                'body_size': round(body, 2),
-                'upper_wick': round(upper_wick, 2),
-                'lower_wick': round(lower_wick, 2),
-                'rejection': rejection,
-                'rejection_type': rejection_type,
-                'open': o,
-                'high': h,
-                'low': l,
-                'close': c
-            }
-        except Exception as e:
-            logger.error(f"❌ Candle error: {e}")
-            return TechnicalAnalyzer._empty_candle()
+        
+        return {
+            'color': color,
+            'size': round(total_size, 2),
+            'body_size': round(body, 2),
+            'upper_wick': round(upper_wick, 2),
+            'lower_wick': round(lower_wick, 2),
+            'rejection': rejection,
+            'rejection_type': rejection_type,
+            'open': o,
+            'high': h,
+            'low': l,
+            'close': c
+        }
     
     @staticmethod
-    def detect_momentum(df, periods=3):
+    def detect_momentum(candles, periods=3):
         """Detect price momentum"""
-        if df is None or len(df) < periods:
+        if candles is None or len(candles) < periods:
             return {
                 'direction': 'unknown',
                 'strength': 0,
@@ -406,9 +535,10 @@ class TechnicalAnalyzer:
                 'consecutive_red': 0
             }
         
-        recent = df.tail(periods)
-        green = sum(recent['close'] > recent['open'])
-        red = sum(recent['close'] < recent['open'])
+        c = candles['close'][-periods:]
+        o = candles['open'][-periods:]
+        green = int((c > o).sum())
+        red = int((c < o).sum())
         
         direction = 'bullish' if green >= 2 else 'bearish' if red >= 2 else 'sideways'
         strength = green if green >= 2 else red if red >= 2 else 0
@@ -438,75 +568,83 @@ class TechnicalAnalyzer:
 
 
 # ==================== Market Analyzer ====================
+# Expiry-day flag only changes at date rollover
+_GAMMA_CACHE = {'date': None, 'val': False}
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _max_pain_kernel(strikes, ce, pe):
+        """Compiled max pain loop - no temporaries, returns (index, pain)"""
+        n = len(strikes)
+        best = 0
+        best_pain = 1e300
+        for i in range(n):
+            p = 0.0
+            for j in range(n):
+                d = strikes[i] - strikes[j]
+                if d > 0:
+                    p += ce[j] * d
+                elif d < 0:
+                    p -= pe[j] * d
+            if p < best_pain:
+                best_pain = p
+                best = i
+        return best, best_pain
+    
+    # Compile (or load from the on-disk cache) at import, not on the first scan
+    _max_pain_kernel(np.array([1.0, 2.0, 3.0]), np.ones(3), np.ones(3))
+
+
+@lru_cache(maxsize=128)
+def _max_pain_core(key):
+    """Max pain over a sorted ((strike, ce_oi, pe_oi), ...) fingerprint"""
+    # Transposed copy -> each column is a contiguous row for the kernel
+    strikes, ce, pe = np.array(key, dtype=np.float64).T.copy()
+    
+    if NUMBA_AVAILABLE:
+        i, pain = _max_pain_kernel(strikes, ce, pe)
+        return int(strikes[i]), round(float(pain), 2)
+    
+    # diff[i, j] = test_strike[i] - strike[j]; CE pain below, PE pain above
+    # (matmul fuses the multiply + row sum)
+    diff = strikes[:, None] - strikes[None, :]
+    pain = np.maximum(diff, 0.0) @ ce + np.maximum(-diff, 0.0) @ pe
+    
+    i = pain.argmin()
+    return int(strikes[i]), round(float(pain[i]), 2)
+
+
 class MarketAnalyzer:
     """Market structure analysis"""
     
     @staticmethod
-    def calculate_max_pain(strike_data, spot_price):
+    def calculate_max_pain(book, spot_price):
         """Calculate max pain strike (uses all 11 strikes)"""
-        if not strike_data:
-            return 0, 0.0
-        
-        strikes = sorted(strike_data.keys())
-        if not strikes:
+        if not book:
             return 0, 0.0
         
-        max_pain_strike = strikes[len(strikes) // 2]
-        min_pain = float('inf')
-        
-        for test_strike in strikes:
-            total_pain = 0.0
-            
-            for strike, data in strike_data.items():
-                ce_oi = data.get('ce_oi', 0)
-                pe_oi = data.get('pe_oi', 0)
-                
-                if test_strike > strike:
-                    total_pain += ce_oi * (test_strike - strike)
-                if test_strike < strike:
-                    total_pain += pe_oi * (strike - test_strike)
-            
-            if total_pain < min_pain:
-                min_pain = total_pain
-                max_pain_strike = test_strike
-        
-        return max_pain_strike, round(min_pain, 2)
+        # Fingerprint of the chain - unchanged chain between ticks hits the cache
+        key = tuple(zip(book.strikes.tolist(), book.ce_oi.tolist(), book.pe_oi.tolist()))
+        return _max_pain_core(key)
     
     @staticmethod
     def detect_gamma_zone():
-        """Check if expiry day (weekly options)"""
+        """Check if expiry day (weekly options) - computed once per day"""
         try:
-            from config import get_next_weekly_expiry
             today = datetime.now(IST).date()
-            expiry = datetime.strptime(get_next_weekly_expiry(), '%Y-%m-%d').date()
-            return today == expiry
+            if _GAMMA_CACHE['date'] != today:
+                expiry = get_next_weekly_expiry_date()
+                _GAMMA_CACHE.update(date=today, val=(today == expiry))
+            return _GAMMA_CACHE['val']
         except:
             return False
     
     @staticmethod
     def calculate_sentiment(pcr, order_flow, ce_change, pe_change):
-        """Calculate market sentiment"""
-        bullish = 0
-        bearish = 0
-        
-        if pcr > PCR_BULLISH:
-            bullish += 1
-        elif pcr < PCR_BEARISH:
-            bearish += 1
-        
-        if order_flow < 1.0:
-            bullish += 1
-        elif order_flow > 1.5:
-            bearish += 1
-        
-        if ce_change < -2.0:
-            bullish += 1
-        if pe_change < -2.0:
-            bearish += 1
-        
-        if bullish > bearish:
-            return "BULLISH"
-        elif bearish > bullish:
-            return "BEARISH"
-        else:
-            return "NEUTRAL"
+        """Calculate market sentiment - one vote per factor, majority wins"""
+        bullish = int(pcr > PCR_BULLISH) + int(order_flow < 1.0) + int(ce_change < -2.0)
+        bearish = int(pcr < PCR_BEARISH) + int(order_flow > 1.5) + int(pe_change < -2.0)
+        
+        score = bullish - bearish
+        return _SENTIMENT[(score > 0) - (score < 0)]
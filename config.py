@@ -5,6 +5,9 @@ Upstox API V2 endpoints verified: https://upstox.com/developer/api-documentation
 """
 import os
 from datetime import datetime, timedelta, time
+from functools import lru_cache
+
+import numpy as np
 
 # ==================== API CONFIGURATION ====================
 # Upstox API V2 - Verified endpoints (Dec 2024)
@@ -14,13 +17,17 @@ UPSTOX_QUOTE_URL = f'{UPSTOX_BASE_URL}/v2/market-quote/quotes'
 UPSTOX_HISTORICAL_URL = f'{UPSTOX_BASE_URL}/v2/historical-candle'
 UPSTOX_OPTION_CHAIN_URL = f'{UPSTOX_BASE_URL}/v2/option/chain'
 UPSTOX_INSTRUMENTS_URL = 'https://assets.upstox.com/market-quote/instruments/exchange/NSE.json.gz'
+INSTRUMENTS_CACHE_FILE = os.getenv('INSTRUMENTS_CACHE_FILE', '.cache/instruments.pkl')
+DETECTION_CACHE_FILE = os.getenv('DETECTION_CACHE_FILE', '.cache/detected_instruments.json')
 
 UPSTOX_ACCESS_TOKEN = os.getenv('UPSTOX_ACCESS_TOKEN', '')
 
 # ==================== MEMORY & STORAGE ====================
 REDIS_URL = os.getenv('REDIS_URL', None)
+REDIS_MAX_CONNECTIONS = 8  # writer + concurrent snapshot lookups
 MEMORY_TTL_HOURS = 24
 MEMORY_TTL_SECONDS = MEMORY_TTL_HOURS * 3600  # 86400 seconds
+MEMORY_MAX_ENTRIES = MEMORY_TTL_HOURS * 60 * 2  # RAM cap: 1 total + 1 strikes hash per minute
 SCAN_INTERVAL = 60  # seconds
 
 # ==================== MARKET TIMINGS ====================
@@ -82,6 +89,7 @@ MIN_CANDLE_SIZE = 5
 EXIT_OI_REVERSAL_THRESHOLD = 3.0      # Sustained building (not 1.0%)
 EXIT_OI_CONFIRMATION_CANDLES = 2      # Need 2 candles confirmation
 EXIT_OI_SPIKE_THRESHOLD = 8.0         # Single spike threshold
+EXIT_OI_HISTORY_LENGTH = 5            # OI changes kept per position
 
 EXIT_VOLUME_DRY_THRESHOLD = 0.5       # Stricter (was 0.8)
 EXIT_PREMIUM_DROP_PERCENT = 15        # More lenient (was 10)
@@ -113,6 +121,11 @@ MIN_CONFIDENCE = 70
 TELEGRAM_ENABLED = os.getenv('TELEGRAM_ENABLED', 'false').lower() == 'true'
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
+TELEGRAM_BATCH_WINDOW = 3.5           # Seconds to coalesce bursts into one send
+TELEGRAM_MAX_MESSAGE_LEN = 4096       # Telegram hard limit per message
+TELEGRAM_MAX_RATE = 30                # Global cap (messages/sec)
+# Full config dump on startup instead of the compact summary
+BOT_STARTUP_VERBOSE = os.getenv('BOT_STARTUP_VERBOSE', 'false').lower() in ('1', 'true')
 
 # ==================== LOGGING ====================
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -128,17 +141,36 @@ ATR_FALLBACK = 30
 
 # ==================== HELPER FUNCTIONS ====================
 
+@lru_cache(maxsize=8)
+def _expiry_date_for(day):
+    """Next Tuesday after `day` - only changes at date rollover"""
+    days_ahead = 1 - day.weekday()  # Tuesday = 1
+    if days_ahead <= 0:
+        days_ahead += 7
+    return day + timedelta(days=days_ahead)
+
+
+@lru_cache(maxsize=8)
+def _expiry_for(day):
+    """Next weekly expiry after `day` as 'YYYY-MM-DD'"""
+    return _expiry_date_for(day).strftime('%Y-%m-%d')
+
+
 def get_next_weekly_expiry():
     """
     Get next Tuesday (weekly options expiry)
     Options are WEEKLY contracts - expires every Tuesday
     """
-    today = datetime.now()
-    days_ahead = 1 - today.weekday()  # Tuesday = 1
-    if days_ahead <= 0:
-        days_ahead += 7
-    next_tuesday = today + timedelta(days=days_ahead)
-    return next_tuesday.strftime('%Y-%m-%d')
+    return _expiry_for(datetime.now().date())
+
+
+def get_next_weekly_expiry_date():
+    """Next weekly expiry as a date (no strptime round-trip)"""
+    return _expiry_date_for(datetime.now().date())
+
+
+# Older name for the weekly expiry helper
+get_next_tuesday_expiry = get_next_weekly_expiry
 
 
 def get_futures_contract_name():
@@ -152,33 +184,40 @@ def get_futures_contract_name():
 
 
 def calculate_atm_strike(spot_price):
-    """Calculate ATM strike (rounded to nearest 50)"""
-    return round(spot_price / STRIKE_GAP) * STRIKE_GAP
+    """
+    Calculate ATM strike (nearest 50, halves round up)
+    Always an int - strike_data keys are ints too
+    """
+    return int((spot_price + STRIKE_GAP * 0.5) // STRIKE_GAP) * STRIKE_GAP
 
 
+@lru_cache(maxsize=64)
 def get_strike_range_fetch(atm_strike):
     """
     Get strike range for FETCHING (11 strikes total)
     ATM ± 5 = 11 strikes covering ±250 points
+    Cached per ATM - the tuple is immutable, safe to share
     """
     min_strike = atm_strike - (STRIKES_TO_FETCH * STRIKE_GAP)
     max_strike = atm_strike + (STRIKES_TO_FETCH * STRIKE_GAP)
     return min_strike, max_strike
 
 
+@lru_cache(maxsize=64)
 def get_deep_analysis_strikes(atm_strike):
     """
     Get strikes for DEEP ANALYSIS (5 strikes only)
     ATM ± 2 = 5 strikes for OI unwinding analysis
-    Returns list of strikes: [ATM-100, ATM-50, ATM, ATM+50, ATM+100]
+    Returns int64 array: [ATM-100, ATM-50, ATM, ATM+50, ATM+100]
+    Cached per ATM - read-only so the shared result can't be mutated
     """
-    strikes = []
-    for i in range(-STRIKES_FOR_ANALYSIS, STRIKES_FOR_ANALYSIS + 1):
-        strikes.append(atm_strike + (i * STRIKE_GAP))
+    n, step = STRIKES_FOR_ANALYSIS, STRIKE_GAP
+    strikes = np.arange(atm_strike - n * step, atm_strike + (n + 1) * step, step, dtype=np.int64)
+    strikes.flags.writeable = False
     return strikes
 
 
 def is_deep_analysis_strike(strike, atm_strike):
-    """Check if strike is in deep analysis range"""
+    """Check if strike is in deep analysis range (O(1), no array needed)"""
     diff = abs(strike - atm_strike)
     return diff <= (STRIKES_FOR_ANALYSIS * STRIKE_GAP)
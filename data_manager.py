@@ -5,34 +5,333 @@ FIXED: Monthly futures auto-detection, LIVE price fetching, 11 strikes fetch
 
 import asyncio
 import aiohttp
+from aiohttp_retry import JitterRetry, RetryClient
+import gzip
 import json
+import logging
+import os
+import pickle
+import struct
 import time as time_module
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional
 from urllib.parse import quote
+import numpy as np
 import pandas as pd
 
 try:
-    import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 from config import *
 from utils import IST, setup_logger
+from analyzers import StrikeBook
 
 logger = setup_logger("data_manager")
 
 MEMORY_TTL_SECONDS = MEMORY_TTL_HOURS * 3600
 
+# Snapshot lookup tolerance: target minute first, then ±1, ±2
+TOLERANCE_OFFSETS = (0, -1, 1, -2, 2)
+
+# Only these instrument fields are used for detection (cached slice)
+INSTRUMENT_FIELDS = ('segment', 'instrument_type', 'name', 'expiry', 'instrument_key', 'trading_symbol')
+
+# Futures candles as one structured array - timestamps are IST wall-clock
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[s]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+    ('oi', 'f8')
+])
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+if MSGSPEC_AVAILABLE:
+    # Option chain schema - decoded straight into structs, unknown fields skipped
+    class _MarketData(msgspec.Struct):
+        oi: Optional[float] = 0.0
+        volume: Optional[float] = 0.0
+        ltp: Optional[float] = 0.0
+    
+    class _OptionSide(msgspec.Struct):
+        market_data: _MarketData = msgspec.field(default_factory=_MarketData)
+    
+    class _ChainEntry(msgspec.Struct):
+        strike_price: float
+        call_options: _OptionSide = msgspec.field(default_factory=_OptionSide)
+        put_options: _OptionSide = msgspec.field(default_factory=_OptionSide)
+    
+    class _ChainResponse(msgspec.Struct):
+        data: List[_ChainEntry]
+    
+    _CHAIN_DECODER = msgspec.json.Decoder(_ChainResponse)
+
+
+def _decode_chain(raw):
+    """
+    Option chain body -> {'data': rows}
+    Typed _ChainEntry rows via msgspec when the payload matches the schema,
+    otherwise plain dicts for the generic json_normalize path
+    """
+    if MSGSPEC_AVAILABLE:
+        try:
+            return {'data': _CHAIN_DECODER.decode(raw).data}
+        except msgspec.ValidationError:
+            pass
+    return _loads(raw)
+
+# Snapshots are raw big-endian numbers - the minute lives in the key, so no
+# timestamp field and no JSON on either the write or the read path
+STRIKE_FIELDS = ('ce_oi', 'pe_oi', 'ce_vol', 'pe_vol', 'ce_ltp', 'pe_ltp')
+_TOTAL_STRUCT = struct.Struct('!2d')   # ce, pe - 16 bytes
+
+# Per-strike rows are integers: OI / volume are counts, LTP is stored in paise
+_STRIKE_DTYPE = np.dtype([
+    ('ce_oi', '>u4'), ('pe_oi', '>u4'),
+    ('ce_vol', '>u8'), ('pe_vol', '>u8'),
+    ('ce_ltp', '>u4'), ('pe_ltp', '>u4')
+])  # STRIKE_FIELDS - 32 bytes
+_LTP_SCALE = 100  # rupees -> paise
+
+
+def _pack_strike_rows(columns):
+    """Field -> values (book arrays or scalars) into packed _STRIKE_DTYPE rows"""
+    rows = np.empty(np.size(columns['ce_oi']), dtype=_STRIKE_DTYPE)
+    for field in STRIKE_FIELDS:
+        values = np.asarray(columns[field], dtype=np.float64)
+        if field.endswith('_ltp'):
+            values = values * _LTP_SCALE
+        rows[field] = np.rint(values).clip(min=0)
+    return rows
+
+
+
+def _pct_change(current, past):
+    """
+    % change, vectorized over any shape (rounded to 0.1)
+    A zero base reads as +100% if anything appeared since, else 0
+    """
+    current = np.asarray(current, dtype=np.float64)
+    past = np.asarray(past, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.where(past == 0, np.where(current > 0, 100.0, 0.0), (current - past) / past * 100)
+    return np.round(change, 1)
+
+
+# Option chain field -> candidate json_normalize columns (v2 names first)
+_CHAIN_COLUMN_NAMES = {
+    'strike': ('strike_price', 'strike'),
+    'ce_oi': ('call_options.market_data.oi', 'CE.market_data.oi'),
+    'pe_oi': ('put_options.market_data.oi', 'PE.market_data.oi'),
+    'ce_vol': ('call_options.market_data.volume', 'CE.market_data.volume'),
+    'pe_vol': ('put_options.market_data.volume', 'PE.market_data.volume'),
+    'ce_ltp': ('call_options.market_data.ltp', 'CE.market_data.ltp'),
+    'pe_ltp': ('put_options.market_data.ltp', 'PE.market_data.ltp')
+}
+
+
+# In-process OI history: one ring slot per minute, indexed by epoch minute % size
+# Covers the longest lookback (15m) plus tolerance - Redis is only read after a
+# restart, until the ring has caught up
+OI_RING_MINUTES = 32
+
+
+def _epoch_minute(minute):
+    """Minutes since the epoch - ring slot = this % OI_RING_MINUTES"""
+    return int(minute.timestamp()) // 60
+
+
+# Background Redis writer: bounded queue, drained in pipelined batches
+WRITE_QUEUE_SIZE = 256
+WRITE_BATCH_SIZE = 32
+
+
+@lru_cache(maxsize=64)
+def _minute_stamps(minute):
+    """Key stamps for a minute and its tolerance offsets (first = minute itself)"""
+    return tuple((minute + timedelta(minutes=offset)).strftime('%Y%m%d_%H%M')
+                 for offset in TOLERANCE_OFFSETS)
+
+
+@lru_cache(maxsize=32)
+def _encode_key(instrument_key):
+    """URL-encoded instrument key - detection yields a tiny fixed set"""
+    return quote(instrument_key, safe='')
+
+
+def _is_nifty_instrument(instrument):
+    """Index rows (spot lookup) and NIFTY futures - everything detection needs"""
+    segment = instrument.get('segment')
+    if segment == 'NSE_INDEX':
+        return True
+    return (segment == 'NSE_FO' and instrument.get('instrument_type') == 'FUT'
+            and instrument.get('name') == 'NIFTY')
+
+
+# Exact NIFTY 50 index names (raw and case-folded forms)
+_SPOT_NAMES = frozenset({'NIFTY', 'NIFTY 50', 'Nifty 50'})
+
+
+def _is_nifty_spot(instrument):
+    """NIFTY 50 index row - raw compare first, .upper() only for odd casing"""
+    symbol = instrument.get('trading_symbol', '')
+    name = instrument.get('name', '')
+    if symbol in _SPOT_NAMES or name in _SPOT_NAMES:
+        return True
+    return symbol.upper() in _SPOT_NAMES or name.upper() in _SPOT_NAMES
+
+
+def _slim_instrument(instrument):
+    """Detection fields only - this is what gets cached"""
+    return {field: instrument[field] for field in INSTRUMENT_FIELDS if field in instrument}
+
+
+def _parse_instruments(content):
+    """Gzipped instruments dump -> NIFTY slice (blocking fallback without ijson, run in an executor)"""
+    rows = _loads(gzip.decompress(content))
+    return [_slim_instrument(i) for i in rows if _is_nifty_instrument(i)]
+
+
+class _GunzipReader:
+    """
+    Async file-like over the gzipped response body - ijson pulls inflated
+    chunks straight off the socket, so neither the compressed dump, the JSON
+    text nor the full instrument list is ever held in memory
+    """
+    
+    def __init__(self, stream, chunk_size=65536):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._inflate = zlib.decompressobj(wbits=31)  # 16 + MAX_WBITS = gzip framing
+    
+    async def read(self, size=-1):
+        if size == 0:
+            return b''  # ijson probes the stream type with read(0)
+        while not self._inflate.eof:
+            chunk = await self._stream.read(self._chunk_size)
+            if not chunk:
+                return self._inflate.flush()
+            data = self._inflate.decompress(chunk)
+            if data:
+                return data
+        return b''
+
+
+async def _stream_instruments(stream):
+    """Gzipped response stream -> NIFTY slice, parsed incrementally with ijson"""
+    rows = ijson.items_async(_GunzipReader(stream), 'item', use_float=True)
+    return [_slim_instrument(i) async for i in rows if _is_nifty_instrument(i)]
+
 
 # ==================== Upstox Client ====================
+class _UpstoxRetry(JitterRetry):
+    """Exponential backoff with jitter - a numeric Retry-After on 429 wins"""
+    
+    def get_timeout(self, attempt, response=None):
+        status = response.status if response is not None else None
+        wait = None
+        if status == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                wait = min(float(retry_after), self._max_timeout)
+        if wait is None:
+            wait = super().get_timeout(attempt, response)
+        
+        reason = f"HTTP {status}" if status else "connection error"
+        logger.warning(f"⚠️ {reason}, retry {attempt}/{self.attempts - 1} in {wait:.1f}s")
+        return wait
+
+
+# Jittered retries keep concurrent failures from retrying in lockstep
+_RETRY_OPTIONS = _UpstoxRetry(
+    attempts=3,
+    start_timeout=0.5,
+    max_timeout=8.0,
+    factor=2.0,
+    statuses={429, 500, 502, 503, 504},
+    exceptions={asyncio.TimeoutError, aiohttp.ClientConnectionError},
+    random_interval_size=0.5
+)
+
+
+# One pooled session per process - re-entering UpstoxClient (reconnects, new
+# client instances) keeps its warm keep-alive connections and DNS cache
+_SESSION = None
+
+
+def _shared_session():
+    """Open (or reopen after close) the process-wide aiohttp session"""
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        # Pooled keep-alive connections outlive the 60s scan gap, so quote /
+        # candle / chain calls reuse TLS sessions instead of reconnecting.
+        # A scan issues at most a handful of concurrent calls to one host
+        connector = aiohttp.TCPConnector(
+            limit=8,
+            limit_per_host=8,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+            ttl_dns_cache=300
+        )
+        _SESSION = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared session - once, at shutdown"""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
+
 class UpstoxClient:
     """Upstox API V2 Client with MONTHLY futures detection"""
     
     def __init__(self):
         self.session = None
-        self._rate_limit_delay = 0.1
-        self._last_request = 0
+        self._headers = {
+            'Authorization': f'Bearer {UPSTOX_ACCESS_TOKEN}',
+            'Accept': 'application/json'
+        }
+        # Token bucket: bursts of up to 10 requests, refilled at 10/s
+        self._rate = 10.0
+        self._burst = 10
+        self._tokens = float(self._burst)
+        self._token_time = time_module.monotonic()
+        # instrument_key -> response key that matched last time
+        self._quote_key_cache = {}
         
         # Instrument keys
         self.spot_key = None
@@ -42,156 +341,241 @@ class UpstoxClient:
         self.futures_symbol = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Retry wrapper is per client; the pooled session underneath is shared
+        self.session = RetryClient(client_session=_shared_session(), retry_options=_RETRY_OPTIONS)
         await self.detect_instruments()
         return self
     
     async def __aexit__(self, *args):
-        if self.session:
-            await self.session.close()
-    
-    def _get_headers(self):
-        return {
-            'Authorization': f'Bearer {UPSTOX_ACCESS_TOKEN}',
-            'Accept': 'application/json'
-        }
+        # Leave the shared session open for the next client - close_session() ends it
+        self.session = None
     
     async def _rate_limit(self):
-        elapsed = asyncio.get_event_loop().time() - self._last_request
-        if elapsed < self._rate_limit_delay:
-            await asyncio.sleep(self._rate_limit_delay - elapsed)
-        self._last_request = asyncio.get_event_loop().time()
+        """
+        Token bucket - refill lazily from one clock read, then take a token
+        Going negative reserves a future token, so concurrent waiters queue
+        up at the refill rate instead of all waking at once
+        """
+        now = time_module.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._token_time) * self._rate)
+        self._token_time = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
     
-    async def _request(self, url, params=None):
-        """Make API request with retry"""
+    async def _request(self, url, params=None, decode=None):
+        """
+        Make API request (`decode` parses the raw body instead of resp.json())
+        Retries with jittered backoff happen inside the RetryClient session
+        """
         await self._rate_limit()
         
-        for attempt in range(3):
-            try:
-                timeout = aiohttp.ClientTimeout(total=10)
-                async with self.session.get(url, headers=self._get_headers(), 
-                                           params=params, timeout=timeout) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    elif resp.status == 429:
-                        logger.warning(f"⚠️ Rate limit, retry {attempt+1}/3")
-                        await asyncio.sleep(2 ** attempt)
-                        continue
-                    else:
-                        text = await resp.text()
-                        logger.error(f"❌ API error {resp.status}: {text[:300]}")
-                        return None
-            
-            except asyncio.TimeoutError:
-                logger.error(f"⏱️ Timeout (attempt {attempt + 1}/3)")
-                if attempt < 2:
-                    await asyncio.sleep(2)
-                    continue
+        try:
+            async with self.session.get(url, headers=self._headers, params=params) as resp:
+                if resp.status == 200:
+                    if decode:
+                        return decode(await resp.read())
+                    return await resp.json(loads=_loads)
+                
+                text = await resp.text()
+                logger.error(f"❌ API error {resp.status}: {text[:300]}")
                 return None
+        
+        except asyncio.TimeoutError:
+            logger.error("⏱️ Timeout (retries exhausted)")
+            return None
+        
+        except Exception as e:
+            logger.error(f"❌ Request failed: {e}")
+            return None
+    
+    def _load_instruments_cache(self):
+        """Cached {'etag', 'last_modified', 'instruments'} or None"""
+        try:
+            with open(INSTRUMENTS_CACHE_FILE, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Instruments cache unreadable: {e}")
+            return None
+    
+    def _save_instruments_cache(self, etag, last_modified, instruments):
+        """Persist the filtered instrument slice with its validators"""
+        try:
+            os.makedirs(os.path.dirname(INSTRUMENTS_CACHE_FILE) or '.', exist_ok=True)
+            tmp = f"{INSTRUMENTS_CACHE_FILE}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump({
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'instruments': instruments
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, INSTRUMENTS_CACHE_FILE)
+        except Exception as e:
+            logger.warning(f"⚠️ Instruments cache not saved: {e}")
+    
+    def _load_detection(self):
+        """
+        Reuse the last detection while its MONTHLY contract would still be
+        picked (> 10 days to expiry) - skips the instruments download entirely
+        """
+        try:
+            with open(DETECTION_CACHE_FILE, 'rb') as f:
+                cached = _loads(f.read())
+            expiry = datetime.fromisoformat(cached['futures_expiry'])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Detection cache unreadable: {e}")
+            return False
+        
+        days_to_expiry = (expiry - datetime.now(IST)).days
+        if days_to_expiry <= 10:
+            return False
+        
+        self.spot_key = cached['spot_key']
+        self.index_key = self.spot_key
+        self.futures_key = cached['futures_key']
+        self.futures_expiry = expiry
+        self.futures_symbol = cached['futures_symbol']
+        
+        logger.info(f"📦 Instruments from cache: {self.spot_key} / {self.futures_symbol} ({days_to_expiry} days)")
+        return True
+    
+    def _save_detection(self):
+        """Persist detected keys - valid until the contract nears expiry"""
+        try:
+            os.makedirs(os.path.dirname(DETECTION_CACHE_FILE) or '.', exist_ok=True)
+            tmp = f"{DETECTION_CACHE_FILE}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({
+                    'spot_key': self.spot_key,
+                    'futures_key': self.futures_key,
+                    'futures_symbol': self.futures_symbol,
+                    'futures_expiry': self.futures_expiry.isoformat()
+                }, f)
+            os.replace(tmp, DETECTION_CACHE_FILE)
+        except Exception as e:
+            logger.warning(f"⚠️ Detection cache not saved: {e}")
+    
+    async def _fetch_instruments(self):
+        """
+        NIFTY slice of the instruments dump - conditional GET against the
+        on-disk cache, so an unchanged dump is never downloaded or parsed again
+        """
+        cache = self._load_instruments_cache()
+        headers = {}
+        if cache:
+            if cache.get('etag'):
+                headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'):
+                headers['If-Modified-Since'] = cache['last_modified']
+        
+        # Full dump can take longer than the API default timeout
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with self.session.get(UPSTOX_INSTRUMENTS_URL, headers=headers, timeout=timeout) as resp:
+            if resp.status == 304 and cache:
+                logger.info(f"📦 Instruments unchanged - using cache ({len(cache['instruments'])} rows)")
+                return cache['instruments']
             
-            except Exception as e:
-                logger.error(f"❌ Request failed (attempt {attempt + 1}/3): {e}")
-                if attempt < 2:
-                    await asyncio.sleep(2)
-                    continue
+            if resp.status != 200:
+                logger.error(f"❌ Instruments fetch failed: {resp.status}")
                 return None
+            
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            
+            if IJSON_AVAILABLE:
+                # Inflate + parse chunk by chunk as the body arrives
+                instruments = await _stream_instruments(resp.content)
+            else:
+                # Whole body, then decompress + parse off the event loop
+                content = await resp.read()
+                loop = asyncio.get_running_loop()
+                instruments = await loop.run_in_executor(None, _parse_instruments, content)
         
-        return None
+        self._save_instruments_cache(etag, last_modified, instruments)
+        
+        return instruments
     
     async def detect_instruments(self):
         """Auto-detect NIFTY instruments (spot + MONTHLY futures)"""
         logger.info("🔍 Auto-detecting NIFTY instruments...")
         
+        if self._load_detection():
+            return True
+        
         try:
-            url = UPSTOX_INSTRUMENTS_URL
-            
-            async with self.session.get(url) as resp:
-                if resp.status != 200:
-                    logger.error(f"❌ Instruments fetch failed: {resp.status}")
-                    return False
-                
-                import gzip
-                content = await resp.read()
-                json_text = gzip.decompress(content).decode('utf-8')
-                instruments = json.loads(json_text)
-            
-            # Find NIFTY spot
-            for instrument in instruments:
-                if instrument.get('segment') != 'NSE_INDEX':
-                    continue
-                
-                name = instrument.get('name', '').upper()
-                symbol = instrument.get('trading_symbol', '').upper()
-                
-                if 'NIFTY 50' in name or 'NIFTY 50' in symbol or symbol == 'NIFTY':
-                    self.spot_key = instrument.get('instrument_key')
-                    self.index_key = self.spot_key
-                    logger.info(f"✅ Spot: {self.spot_key}")
-                    break
-            
-            if not self.spot_key:
-                logger.error("❌ NIFTY spot not found")
+            instruments = await self._fetch_instruments()
+            if instruments is None:
                 return False
             
-            # Find MONTHLY futures (SMART DETECTION - based on days to expiry)
-            # Logic: Monthly futures have 20-35 days to expiry typically
-            #        Weekly futures have 0-7 days to expiry
+            # ONE pass: spot by segment dispatch, futures tracked as running minimums
+            # SMART SELECTION LOGIC (based on days to expiry):
+            # 1. Nearest futures with > 10 days → It's MONTHLY (use it)
+            # 2. Contracts with < 10 days are WEEKLY (skipped)
+            # 3. This handles holidays automatically!
             now = datetime.now(IST)
-            all_futures = []
+            spot_key = None
+            nearest = None   # (expiry_dt, instrument) - emergency fallback
+            monthly = None   # (expiry_dt, instrument) - nearest with > 10 days
             
             for instrument in instruments:
-                if instrument.get('segment') != 'NSE_FO':
+                segment = instrument.get('segment')
+                if segment == 'NSE_INDEX':
+                    if spot_key is None and _is_nifty_spot(instrument):
+                        spot_key = instrument.get('instrument_key')
                     continue
-                if instrument.get('instrument_type') != 'FUT':
-                    continue
-                if instrument.get('name') != 'NIFTY':
+                
+                if (segment != 'NSE_FO' or instrument.get('instrument_type') != 'FUT'
+                        or instrument.get('name') != 'NIFTY'):
                     continue
                 
-                expiry_ms = instrument.get('expiry', 0)
-                if not expiry_ms:
+                # Cheap type/sign guard keeps malformed rows off the exception path
+                expiry_ms = instrument.get('expiry')
+                if not isinstance(expiry_ms, (int, float)) or expiry_ms <= 0:
                     continue
                 
                 try:
                     expiry_dt = datetime.fromtimestamp(expiry_ms / 1000, tz=IST)
-                    
-                    # Only consider futures that expire AFTER today
-                    if expiry_dt > now:
-                        days_to_expiry = (expiry_dt - now).days
-                        all_futures.append({
-                            'key': instrument.get('instrument_key'),
-                            'expiry': expiry_dt,
-                            'symbol': instrument.get('trading_symbol', ''),
-                            'days_to_expiry': days_to_expiry,
-                            'weekday': expiry_dt.strftime('%A')
-                        })
-                except:
+                except (ValueError, OSError, OverflowError):
                     continue
+                
+                # Only consider futures that expire AFTER today
+                if expiry_dt <= now:
+                    continue
+                
+                if nearest is None or expiry_dt < nearest[0]:
+                    nearest = (expiry_dt, instrument)
+                if (expiry_dt - now).days > 10 and (monthly is None or expiry_dt < monthly[0]):
+                    monthly = (expiry_dt, instrument)
             
-            if not all_futures:
-                logger.error("❌ No futures contracts found")
+            if not spot_key:
+                logger.error("❌ NIFTY spot not found")
                 return False
             
-            # Sort by expiry date
-            all_futures.sort(key=lambda x: x['expiry'])
-            
-            # SMART SELECTION LOGIC:
-            # 1. If nearest futures has > 10 days → It's MONTHLY (use it)
-            # 2. If nearest futures has < 10 days → It's WEEKLY (skip to next)
-            # 3. This handles holidays automatically!
+            self.spot_key = spot_key
+            self.index_key = spot_key
+            logger.info(f"✅ Spot: {self.spot_key}")
             
-            monthly_futures = None
-            
-            for fut in all_futures:
-                if fut['days_to_expiry'] > 10:
-                    # This is a MONTHLY contract (far expiry)
-                    monthly_futures = fut
-                    break
+            if nearest is None:
+                logger.error("❌ No futures contracts found")
+                return False
             
             # Fallback: If no contract > 10 days, use nearest (emergency case)
-            if not monthly_futures:
-                monthly_futures = all_futures[0]
+            if monthly is None:
+                monthly = nearest
                 logger.warning(f"⚠️ Using nearest futures (no contract > 10 days found)")
             
+            expiry_dt, instrument = monthly
+            monthly_futures = {
+                'key': instrument.get('instrument_key'),
+                'expiry': expiry_dt,
+                'symbol': instrument.get('trading_symbol', ''),
+                'days_to_expiry': (expiry_dt - now).days
+            }
+            
             self.futures_key = monthly_futures['key']
             self.futures_expiry = monthly_futures['expiry']
             self.futures_symbol = monthly_futures['symbol']
@@ -200,6 +584,10 @@ class UpstoxClient:
             logger.info(f"   Expiry: {monthly_futures['expiry'].strftime('%Y-%m-%d %A')} ({monthly_futures['days_to_expiry']} days)")
             logger.info(f"   Type: {'MONTHLY' if monthly_futures['days_to_expiry'] > 10 else 'WEEKLY (fallback)'}")
             
+            # Fallback picks are re-detected next start (a new month may list)
+            if monthly_futures['days_to_expiry'] > 10:
+                self._save_detection()
+            
             return True
         
         except Exception as e:
@@ -211,7 +599,7 @@ class UpstoxClient:
         if not instrument_key:
             return None
         
-        encoded = quote(instrument_key, safe='')
+        encoded = _encode_key(instrument_key)
         url = f"{UPSTOX_QUOTE_URL}?symbol={encoded}"
         
         data = await self._request(url)
@@ -221,21 +609,22 @@ class UpstoxClient:
         
         quotes = data['data']
         
-        # Try exact match
-        if instrument_key in quotes:
-            return quotes[instrument_key]
-        
-        # Try colon format
-        alt_key = instrument_key.replace('|', ':')
-        if alt_key in quotes:
-            return quotes[alt_key]
+        # Response keys are 'SEGMENT:symbol' (trading symbol for F&O) - probe the
+        # cached key, then both separator forms; no scan over the response
+        cached = self._quote_key_cache.get(instrument_key)
+        if cached is not None and cached in quotes:
+            return quotes[cached]
         
-        # Try segment match
-        segment = instrument_key.split('|')[0] if '|' in instrument_key else instrument_key.split(':')[0]
-        for key in quotes.keys():
-            if key.startswith(segment):
+        for key in (instrument_key.replace('|', ':'), instrument_key):
+            if key in quotes:
+                self._quote_key_cache[instrument_key] = key
                 return quotes[key]
         
+        if len(quotes) == 1:
+            key, match = next(iter(quotes.items()))  # Single-symbol request
+            self._quote_key_cache[instrument_key] = key
+            return match
+        
         logger.error(f"❌ Instrument not found in: {list(quotes.keys())[:3]}")
         return None
     
@@ -244,7 +633,7 @@ class UpstoxClient:
         if not instrument_key:
             return None
         
-        encoded = quote(instrument_key, safe='')
+        encoded = _encode_key(instrument_key)
         url = f"{UPSTOX_HISTORICAL_URL}/intraday/{encoded}/{interval}"
         
         data = await self._request(url)
@@ -259,10 +648,10 @@ class UpstoxClient:
         if not instrument_key:
             return None
         
-        encoded = quote(instrument_key, safe='')
+        encoded = _encode_key(instrument_key)
         url = f"{UPSTOX_OPTION_CHAIN_URL}?instrument_key={encoded}&expiry_date={expiry_date}"
         
-        data = await self._request(url)
+        data = await self._request(url, decode=_decode_chain)
         
         if not data:
             logger.error("❌ Option chain API returned None")
@@ -281,42 +670,137 @@ class RedisBrain:
     
     def __init__(self):
         self.client = None
-        self.memory = {}
-        self.memory_timestamps = {}
+        # Pending Redis writes - saves never wait on a Redis round-trip
+        self._writes = None
+        self._writer = None
+        # RAM fallback: key -> (value, saved_at), oldest first
+        self.memory = OrderedDict()
         self.snapshot_count = 0
         self.first_snapshot_time = None
         self.premarket_loaded = False
+        # Scan minute stamped by begin_cycle - default `now` for saves / lookups
+        self._cycle_now = None
+        # OI ring: epoch minute held by each slot (-1 = empty), totals and
+        # (strikes, ce_oi, pe_oi) book arrays by reference - no copies
+        self._ring_since = None
+        self._ring_total_minute = np.full(OI_RING_MINUTES, -1, dtype=np.int64)
+        self._ring_totals = np.zeros((OI_RING_MINUTES, 2))
+        self._ring_strike_minute = np.full(OI_RING_MINUTES, -1, dtype=np.int64)
+        self._ring_strikes = [None] * OI_RING_MINUTES
+    
+    async def connect(self):
+        """Connect to Redis (async client) and start the background writer"""
+        if not (REDIS_AVAILABLE and REDIS_URL):
+            logger.info(f"💾 RAM mode (TTL: {MEMORY_TTL_HOURS}h)")
+            return
         
-        if REDIS_AVAILABLE and REDIS_URL:
+        try:
+            # Bytes mode (packed snapshots); a small pool lets the writer and
+            # concurrent lookups each use their own socket
+            pool = aioredis.ConnectionPool.from_url(REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS)
+            self.client = aioredis.Redis.from_pool(pool)
+            await self.client.ping()
+            self._writes = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+            self._writer = asyncio.create_task(self._write_loop())
+            logger.info(f"✅ Redis connected (TTL: {MEMORY_TTL_HOURS}h)")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis failed: {e}. Using RAM.")
+            self.client = None
+    
+    async def close(self):
+        """Flush pending writes, stop the writer and close the connection"""
+        if self._writer:
             try:
-                self.client = redis.from_url(REDIS_URL, decode_responses=True)
-                self.client.ping()
-                logger.info(f"✅ Redis connected (TTL: {MEMORY_TTL_HOURS}h)")
+                await asyncio.wait_for(self._writes.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Dropping {self._writes.qsize()} unflushed Redis writes")
+            self._writer.cancel()
+            self._writer = None
+        
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+    
+    def _queue_write(self, op, key, value):
+        """Hand a write to the background writer - RAM if Redis is off or backed up"""
+        if self._writes is not None:
+            try:
+                self._writes.put_nowait((op, key, value))
+                return
+            except asyncio.QueueFull:
+                pass
+        self._ram_write(op, key, value)
+    
+    async def _write_loop(self):
+        """Drain queued writes into one pipelined round-trip per batch"""
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            
+            try:
+                pipe = self.client.pipeline(transaction=False)
+                for op, key, value in batch:
+                    if op == 'hset':
+                        pipe.hset(key, mapping=value)
+                        pipe.expire(key, MEMORY_TTL_SECONDS)
+                    else:
+                        pipe.setex(key, MEMORY_TTL_SECONDS, value)
+                await pipe.execute()
             except Exception as e:
-                logger.warning(f"⚠️ Redis failed: {e}. Using RAM.")
-                self.client = None
-        else:
-            logger.info(f"💾 RAM mode (TTL: {MEMORY_TTL_HOURS}h)")
+                logger.warning(f"⚠️ Redis write failed: {e}. Using RAM.")
+                for item in batch:
+                    self._ram_write(*item)
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+    
+    def begin_cycle(self, now=None):
+        """Stamp the scan minute once - later saves / lookups default to it"""
+        self._cycle_now = (now or datetime.now(IST)).replace(second=0, microsecond=0)
+        return self._cycle_now
+    
+    def _minute(self, now=None):
+        """Scan minute - explicit `now`, else the cycle stamp, else the clock"""
+        return (now or self._cycle_now or datetime.now(IST)).replace(second=0, microsecond=0)
+    
+    def _ring_mark(self, minute):
+        """Ring slot for a minute being saved (first save starts the ring's coverage)"""
+        m = _epoch_minute(minute)
+        if self._ring_since is None:
+            self._ring_since = m
+        return m, m % OI_RING_MINUTES
+    
+    def _ring_find(self, slot_minutes, target):
+        """
+        Slot nearest the target minute (same tolerance order as Redis lookups)
+        None if nothing there or the ring does not yet cover the whole window
+        """
+        t = _epoch_minute(target)
+        if self._ring_since is None or t + min(TOLERANCE_OFFSETS) < self._ring_since:
+            return None
+        
+        for offset in TOLERANCE_OFFSETS:
+            m = t + offset
+            if slot_minutes[m % OI_RING_MINUTES] == m:
+                return m % OI_RING_MINUTES
+        return None
     
-    def save_total_oi(self, ce, pe):
+    def save_total_oi(self, ce, pe, now=None):
         """Save total OI snapshot"""
-        now = datetime.now(IST).replace(second=0, microsecond=0)
-        key = f"nifty:total:{now.strftime('%Y%m%d_%H%M')}"
-        value = json.dumps({'ce': ce, 'pe': pe, 'timestamp': now.isoformat()})
+        now = self._minute(now)
+        key = f"nifty:total:{_minute_stamps(now)[0]}"
+        value = _TOTAL_STRUCT.pack(ce, pe)
+        
+        m, slot = self._ring_mark(now)
+        self._ring_total_minute[slot] = m
+        self._ring_totals[slot] = ce, pe
         
         if self.snapshot_count == 0:
             self.first_snapshot_time = now
             logger.info(f"📍 FIRST SNAPSHOT at {now.strftime('%H:%M')} - BASE REFERENCE")
         
-        if self.client:
-            try:
-                self.client.setex(key, MEMORY_TTL_SECONDS, value)
-            except:
-                self.memory[key] = value
-                self.memory_timestamps[key] = time_module.time()
-        else:
-            self.memory[key] = value
-            self.memory_timestamps[key] = time_module.time()
+        self._queue_write('set', key, value)
         
         self.snapshot_count += 1
         
@@ -325,198 +809,274 @@ class RedisBrain:
         
         self._cleanup()
     
-    def get_total_oi_change(self, current_ce, current_pe, minutes_ago=15):
-        """Get OI change with tolerance"""
-        target = datetime.now(IST) - timedelta(minutes=minutes_ago)
-        target = target.replace(second=0, microsecond=0)
-        key = f"nifty:total:{target.strftime('%Y%m%d_%H%M')}"
-        
-        past_str = None
-        if self.client:
-            try:
-                past_str = self.client.get(key)
-            except:
-                pass
+    async def get_total_oi_change(self, current_ce, current_pe, minutes_ago=15, now=None):
+        """Get OI change with tolerance (ring first, Redis / RAM after a restart)"""
+        target = self._minute(now) - timedelta(minutes=minutes_ago)
         
-        if not past_str:
-            past_str = self.memory.get(key)
+        slot = self._ring_find(self._ring_total_minute, target)
+        if slot is not None:
+            ce_chg, pe_chg = _pct_change((current_ce, current_pe), self._ring_totals[slot]).tolist()
+            return ce_chg, pe_chg, True
         
-        # Try tolerance
-        if not past_str:
-            for offset in [-1, 1, -2, 2]:
-                alt = target + timedelta(minutes=offset)
-                alt_key = f"nifty:total:{alt.strftime('%Y%m%d_%H%M')}"
-                
-                if self.client:
-                    try:
-                        past_str = self.client.get(alt_key)
-                        if past_str:
-                            break
-                    except:
-                        pass
-                
-                if not past_str:
-                    past_str = self.memory.get(alt_key)
-                    if past_str:
-                        break
+        past = await self._get_nearest("nifty:total", target)
         
-        if not past_str:
+        if not past:
             return 0.0, 0.0, False
         
         try:
-            past = json.loads(past_str)
-            past_ce = past.get('ce', 0)
-            past_pe = past.get('pe', 0)
-            
-            if past_ce == 0:
-                ce_chg = 100.0 if current_ce > 0 else 0.0
-            else:
-                ce_chg = ((current_ce - past_ce) / past_ce * 100)
-            
-            if past_pe == 0:
-                pe_chg = 100.0 if current_pe > 0 else 0.0
-            else:
-                pe_chg = ((current_pe - past_pe) / past_pe * 100)
-            
-            return round(ce_chg, 1), round(pe_chg, 1), True
+            ce_chg, pe_chg = _pct_change((current_ce, current_pe), _TOTAL_STRUCT.unpack(past)).tolist()
+            return ce_chg, pe_chg, True
         
         except Exception as e:
             logger.error(f"❌ Parse error: {e}")
             return 0.0, 0.0, False
     
-    def save_strike(self, strike, data):
+    def save_strike(self, strike, data, now=None):
         """Save strike OI"""
-        now = datetime.now(IST).replace(second=0, microsecond=0)
-        key = f"nifty:strike:{strike}:{now.strftime('%Y%m%d_%H%M')}"
+        row = _pack_strike_rows({f: data.get(f, 0.0) for f in STRIKE_FIELDS})
+        self._save_strike_fields({str(strike): row.tobytes()}, now)
+    
+    def save_strikes(self, book, now=None):
+        """
+        Save all strikes of a StrikeBook for this minute into ONE hash (field = strike)
+        Rows are packed in one go as _STRIKE_DTYPE integers (32 bytes per strike)
+        """
+        packed = _pack_strike_rows({f: getattr(book, f) for f in STRIKE_FIELDS})
+        fields = {str(strike): row.tobytes() for strike, row in zip(book.strikes.tolist(), packed)}
+        self._save_strike_fields(fields, now)
         
-        data_with_ts = data.copy()
-        data_with_ts['timestamp'] = now.isoformat()
-        value = json.dumps(data_with_ts)
+        # Book arrays are built fresh every scan - the ring keeps references
+        m, slot = self._ring_mark(self._minute(now))
+        self._ring_strike_minute[slot] = m
+        self._ring_strikes[slot] = (book.strikes, book.ce_oi, book.pe_oi)
+    
+    def _save_strike_fields(self, fields, now=None):
+        """HSET + EXPIRE go out together in the writer's next pipeline"""
+        now = self._minute(now)
+        key = f"nifty:strikes:{_minute_stamps(now)[0]}"
+        self._queue_write('hset', key, fields)
+    
+    async def get_strike_oi_change(self, strike, current_data, minutes_ago=15, now=None):
+        """Get strike OI change"""
+        target = self._minute(now) - timedelta(minutes=minutes_ago)
+        past = await self._get_nearest_field("nifty:strikes", str(strike), target)
         
+        if not past or len(past) != _STRIKE_DTYPE.itemsize:
+            return 0.0, 0.0, False
+        
+        try:
+            current = (current_data.get('ce_oi', 0), current_data.get('pe_oi', 0))
+            row = np.frombuffer(past, dtype=_STRIKE_DTYPE)[0]
+            ce_chg, pe_chg = _pct_change(current, (row['ce_oi'], row['pe_oi'])).tolist()
+            return ce_chg, pe_chg, True
+        
+        except Exception as e:
+            logger.error(f"❌ Parse error: {e}")
+            return 0.0, 0.0, False
+    
+    async def get_strikes_oi_change(self, book, minutes_ago=15, now=None):
+        """
+        OI change for EVERY strike in the book from the nearest snapshot
+        (in-process ring, else the per-minute Redis hash)
+        Returns arrays aligned with book.strikes: (ce_chg %, pe_chg %, has_past)
+        """
+        n = len(book)
+        ce_chg, pe_chg, has = np.zeros(n), np.zeros(n), np.zeros(n, dtype=bool)
+        
+        if not n:
+            return ce_chg, pe_chg, has
+        
+        target = self._minute(now) - timedelta(minutes=minutes_ago)
+        slot = self._ring_find(self._ring_strike_minute, target)
+        if slot is not None:
+            past_strikes, past_ce, past_pe = self._ring_strikes[slot]
+        else:
+            fields = await self._get_nearest_hash("nifty:strikes", target)
+            if not fields:
+                return ce_chg, pe_chg, has
+            
+            # Rows of another layout (e.g. written before an upgrade) are not comparable
+            if any(len(v) != _STRIKE_DTYPE.itemsize for v in fields.values()):
+                return ce_chg, pe_chg, has
+            
+            try:
+                past_strikes = np.array([int(k) for k in fields], dtype=np.int64)
+                past = np.frombuffer(b''.join(fields.values()), dtype=_STRIKE_DTYPE)
+            except (ValueError, TypeError) as e:
+                logger.error(f"❌ Parse error: {e}")
+                return ce_chg, pe_chg, has
+            
+            order = np.argsort(past_strikes)
+            past_strikes, past_ce, past_pe = past_strikes[order], past['ce_oi'][order], past['pe_oi'][order]
+        
+        if not len(past_strikes):
+            return ce_chg, pe_chg, has
+        
+        # Align the stored strikes with the book (both sorted, one searchsorted)
+        idx = np.searchsorted(past_strikes, book.strikes).clip(max=len(past_strikes) - 1)
+        has = past_strikes[idx] == book.strikes
+        
+        ce_chg = np.where(has, _pct_change(book.ce_oi, past_ce[idx]), 0.0)
+        pe_chg = np.where(has, _pct_change(book.pe_oi, past_pe[idx]), 0.0)
+        return ce_chg, pe_chg, has
+    
+    async def _get_nearest(self, prefix, target):
+        """
+        Snapshot at the target minute, else the nearest within ±2 minutes
+        All candidate keys go to Redis in ONE MGET round-trip
+        """
+        keys = [f"{prefix}:{stamp}" for stamp in _minute_stamps(target)]
+        
+        values = [None] * len(keys)
         if self.client:
             try:
-                self.client.setex(key, MEMORY_TTL_SECONDS, value)
+                values = await self.client.mget(keys)
             except:
-                self.memory[key] = value
-                self.memory_timestamps[key] = time_module.time()
-        else:
-            self.memory[key] = value
-            self.memory_timestamps[key] = time_module.time()
+                pass
+        
+        # Same precedence as before: per offset, Redis first then RAM
+        for key, value in zip(keys, values):
+            value = value or self._ram_get(key)
+            if value:
+                return value
+        
+        return None
     
-    def get_strike_oi_change(self, strike, current_data, minutes_ago=15):
-        """Get strike OI change"""
-        target = datetime.now(IST) - timedelta(minutes=minutes_ago)
-        target = target.replace(second=0, microsecond=0)
-        key = f"nifty:strike:{strike}:{target.strftime('%Y%m%d_%H%M')}"
+    async def _get_nearest_field(self, prefix, field, target):
+        """Same tolerance search as _get_nearest, over one field of the per-minute hashes"""
+        keys = [f"{prefix}:{stamp}" for stamp in _minute_stamps(target)]
         
-        past_str = None
+        values = [None] * len(keys)
         if self.client:
             try:
-                past_str = self.client.get(key)
+                pipe = self.client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hget(key, field)
+                values = await pipe.execute()
             except:
                 pass
         
-        if not past_str:
-            past_str = self.memory.get(key)
+        for key, value in zip(keys, values):
+            value = value or (self._ram_get(key) or {}).get(field)
+            if value:
+                return value
         
-        if not past_str:
-            for offset in [-1, 1, -2, 2]:
-                alt = target + timedelta(minutes=offset)
-                alt_key = f"nifty:strike:{strike}:{alt.strftime('%Y%m%d_%H%M')}"
-                
-                if self.client:
-                    try:
-                        past_str = self.client.get(alt_key)
-                        if past_str:
-                            break
-                    except:
-                        pass
-                
-                if not past_str:
-                    past_str = self.memory.get(alt_key)
-                    if past_str:
-                        break
+        return None
+    
+    async def _get_nearest_hash(self, prefix, target):
+        """Whole per-minute hash at the target minute, else the nearest within ±2 minutes"""
+        keys = [f"{prefix}:{stamp}" for stamp in _minute_stamps(target)]
         
-        if not past_str:
-            return 0.0, 0.0, False
+        values = [None] * len(keys)
+        if self.client:
+            try:
+                pipe = self.client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hgetall(key)
+                values = await pipe.execute()
+            except:
+                pass
         
-        try:
-            past = json.loads(past_str)
-            
-            ce_past = past.get('ce_oi', 0)
-            pe_past = past.get('pe_oi', 0)
-            ce_curr = current_data.get('ce_oi', 0)
-            pe_curr = current_data.get('pe_oi', 0)
-            
-            if ce_past == 0:
-                ce_chg = 100.0 if ce_curr > 0 else 0.0
-            else:
-                ce_chg = ((ce_curr - ce_past) / ce_past * 100)
-            
-            if pe_past == 0:
-                pe_chg = 100.0 if pe_curr > 0 else 0.0
-            else:
-                pe_chg = ((pe_curr - pe_past) / pe_past * 100)
-            
-            return round(ce_chg, 1), round(pe_chg, 1), True
+        for key, value in zip(keys, values):
+            value = value or self._ram_get(key)
+            if value:
+                return value
         
-        except Exception as e:
-            logger.error(f"❌ Parse error: {e}")
-            return 0.0, 0.0, False
+        return None
     
-    def is_warmed_up(self, minutes=15):
+    async def is_warmed_up(self, minutes=15, now=None):
         """Check warmup from first snapshot"""
+        return (await self.warmup_flags((minutes,), now))[minutes]
+    
+    async def warmup_flags(self, windows=(5, 10, 15), now=None):
+        """
+        is_warmed_up for several windows - all probe keys checked in ONE pipeline
+        Returns: {minutes: bool}
+        """
+        flags = dict.fromkeys(windows, False)
         if not self.first_snapshot_time:
-            return False
+            return flags
         
-        elapsed = (datetime.now(IST) - self.first_snapshot_time).total_seconds() / 60
+        now = now or self._cycle_now or datetime.now(IST)
+        elapsed = (now - self.first_snapshot_time).total_seconds() / 60
         
-        if elapsed < minutes:
-            return False
-        
-        test_time = datetime.now(IST) - timedelta(minutes=minutes)
-        test_key = f"nifty:total:{test_time.strftime('%Y%m%d_%H%M')}"
+        # Only windows already covered by the first snapshot need a probe
+        keys = {
+            minutes: f"nifty:total:{_minute_stamps(self._minute(now - timedelta(minutes=minutes)))[0]}"
+            for minutes in windows if elapsed >= minutes
+        }
+        if not keys:
+            return flags
         
-        has_data = False
         if self.client:
             try:
-                has_data = self.client.exists(test_key) > 0
-            except:
-                has_data = test_key in self.memory
-        else:
-            has_data = test_key in self.memory
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for key in keys.values():
+                        pipe.exists(key)
+                    found = await pipe.execute()
+                flags.update((minutes, n > 0) for minutes, n in zip(keys, found))
+                return flags
+            except Exception:
+                pass
         
-        return has_data
+        flags.update((minutes, key in self.memory) for minutes, key in keys.items())
+        return flags
     
-    def get_stats(self):
+    async def get_stats(self):
         """Get memory stats"""
+        now = self._cycle_now or datetime.now(IST)
         if not self.first_snapshot_time:
             elapsed = 0
         else:
-            elapsed = (datetime.now(IST) - self.first_snapshot_time).total_seconds() / 60
+            elapsed = (now - self.first_snapshot_time).total_seconds() / 60
         
+        warm = await self.warmup_flags((5, 10, 15), now)
         return {
             'snapshot_count': self.snapshot_count,
             'elapsed_minutes': elapsed,
             'first_snapshot_time': self.first_snapshot_time,
-            'warmed_up_5m': self.is_warmed_up(5),
-            'warmed_up_10m': self.is_warmed_up(10),
-            'warmed_up_15m': self.is_warmed_up(15)
+            'warmed_up_5m': warm[5],
+            'warmed_up_10m': warm[10],
+            'warmed_up_15m': warm[15]
         }
     
+    def _ram_set(self, key, value):
+        """Store in RAM - newest at the end, oldest evicted past the cap"""
+        self.memory[key] = (value, time_module.time())
+        self.memory.move_to_end(key)
+        if len(self.memory) > MEMORY_MAX_ENTRIES:
+            self.memory.popitem(last=False)
+    
+    def _ram_write(self, op, key, value):
+        """RAM fallback for one queued write"""
+        if op == 'hset':
+            self._ram_hset(key, value)
+        else:
+            self._ram_set(key, value)
+    
+    def _ram_hset(self, key, fields):
+        """RAM mirror of HSET - merge fields into the stored hash"""
+        entry = self.memory.get(key)
+        self._ram_set(key, {**entry[0], **fields} if entry else fields)
+    
+    def _ram_get(self, key):
+        entry = self.memory.get(key)
+        return entry[0] if entry else None
+    
     def _cleanup(self):
-        """Clean expired RAM entries"""
-        if not self.memory:
-            return
+        """Clean expired RAM entries - saves are time-ordered, so only the front can expire"""
         now = time_module.time()
-        expired = [k for k, ts in self.memory_timestamps.items() 
-                  if now - ts > MEMORY_TTL_SECONDS]
-        for key in expired:
-            self.memory.pop(key, None)
-            self.memory_timestamps.pop(key, None)
+        expired = 0
+        
+        while self.memory:
+            _, saved_at = next(iter(self.memory.values()))
+            if now - saved_at <= MEMORY_TTL_SECONDS:
+                break
+            self.memory.popitem(last=False)
+            expired += 1
         
         if expired:
-            logger.info(f"🧹 Cleaned {len(expired)} expired entries")
+            logger.info(f"🧹 Cleaned {expired} expired entries")
     
     async def load_previous_day_data(self):
         """Skip previous day data"""
@@ -532,6 +1092,43 @@ class DataFetcher:
     
     def __init__(self, client):
         self.client = client
+        self.last_spot = None  # ATM hint for the next cycle
+        # field -> json_normalize column that carried it (response shape is stable)
+        self._chain_columns = None
+    
+    async def fetch_all(self, spot_hint=None):
+        """
+        Fetch spot, futures candles, futures LTP and option chain in one round trip
+        The chain only needs spot for its ATM window - with a hint from the previous
+        cycle all four requests go out together, and the chain is refetched only if
+        the live spot moved ATM to another strike
+        Returns: (spot, futures_candles, futures_ltp, option_result)
+        """
+        spot_hint = spot_hint if spot_hint is not None else self.last_spot
+        
+        if spot_hint is None:
+            spot = await self.fetch_spot()
+            if not spot:
+                return None, None, None, None
+            futures_candles, futures_ltp, option_result = await asyncio.gather(
+                self.fetch_futures_candles(),
+                self.fetch_futures_ltp(),
+                self.fetch_option_chain(spot)
+            )
+        else:
+            spot, futures_candles, futures_ltp, option_result = await asyncio.gather(
+                self.fetch_spot(),
+                self.fetch_futures_candles(),
+                self.fetch_futures_ltp(),
+                self.fetch_option_chain(spot_hint)
+            )
+            if spot and calculate_atm_strike(spot) != calculate_atm_strike(spot_hint):
+                logger.info(f"🔁 ATM shifted ({spot_hint:.2f} → {spot:.2f}) - refetching chain")
+                option_result = await self.fetch_option_chain(spot)
+        
+        if spot:
+            self.last_spot = spot
+        return spot, futures_candles, futures_ltp, option_result
     
     async def fetch_spot(self):
         """Fetch spot price (for ATM calculation)"""
@@ -571,10 +1168,8 @@ class DataFetcher:
             if not candles:
                 return None
             
-            df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            return df
+            # '2025-01-06T09:15:00+05:30' -> drop the offset, NumPy parses naive ISO
+            return np.array([(c[0][:19], *c[1:7]) for c in candles], dtype=CANDLE_DTYPE)
         
         except Exception as e:
             logger.error(f"❌ Futures candles error: {e}")
@@ -604,6 +1199,63 @@ class DataFetcher:
             logger.error(f"❌ Futures LTP error: {e}")
             return None
     
+    @staticmethod
+    def _filter_chain(chain, min_strike, max_strike):
+        """Strike-range mask + dedupe over a parsed chain frame (boolean indexing, no loop)"""
+        strikes = chain['strike']
+        chain = chain[(strikes != 0) & (strikes >= min_strike) & (strikes <= max_strike)]
+        return chain.astype({'strike': 'int64'}).drop_duplicates('strike', keep='last')
+    
+    @staticmethod
+    def _resolve_chain_columns(columns):
+        """Pick the first present column name per field (None = field absent)"""
+        return {
+            field: next((name for name in names if name in columns), None)
+            for field, names in _CHAIN_COLUMN_NAMES.items()
+        }
+    
+    def _parse_option_chain(self, rows, min_strike, max_strike):
+        """
+        Flatten option chain rows with json_normalize and pick the OI / volume /
+        LTP columns - no per-strike Python loop of .get()/float() calls
+        Column names are resolved on the first poll and reused while they still match
+        Returns: frame with columns strike + STRIKE_FIELDS (float64)
+        """
+        if not rows:
+            return pd.DataFrame(columns=('strike',) + STRIKE_FIELDS)
+        
+        df = pd.json_normalize(rows)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"🔍 DEBUG: Chain columns: {list(df.columns)[:8]}")
+        
+        resolved = self._chain_columns
+        if resolved is None or any(name and name not in df.columns for name in resolved.values()):
+            resolved = self._chain_columns = self._resolve_chain_columns(df.columns)
+            logger.debug(f"🔍 Chain layout: {resolved}")
+        
+        def column(name):
+            """Numeric column with 0 for missing"""
+            if name is None:
+                return pd.Series(0.0, index=df.index)
+            return pd.to_numeric(df[name], errors='coerce').fillna(0.0).astype('float64')
+        
+        chain = pd.DataFrame({field: column(name) for field, name in resolved.items()})
+        
+        return DataFetcher._filter_chain(chain, min_strike, max_strike)
+    
+    @staticmethod
+    def _parse_chain_entries(entries, min_strike, max_strike):
+        """Typed (msgspec) chain rows -> same frame as _parse_option_chain"""
+        records = []
+        for entry in entries:
+            ce = entry.call_options.market_data
+            pe = entry.put_options.market_data
+            records.append((entry.strike_price, ce.oi or 0.0, pe.oi or 0.0,
+                            ce.volume or 0.0, pe.volume or 0.0, ce.ltp or 0.0, pe.ltp or 0.0))
+        
+        chain = pd.DataFrame.from_records(records, columns=('strike',) + STRIKE_FIELDS)
+        return DataFetcher._filter_chain(chain, min_strike, max_strike)
+    
     async def fetch_option_chain(self, spot_price):
         """Fetch WEEKLY option chain - 11 strikes (ATM ± 5)"""
         try:
@@ -621,95 +1273,40 @@ class DataFetcher:
             if not data:
                 return None
             
-            # DEBUG: Log response structure
-            logger.info(f"🔍 DEBUG: Response type: {type(data)}")
-            if isinstance(data, dict):
-                logger.info(f"🔍 DEBUG: Top-level keys: {list(data.keys())[:5]}")
-            elif isinstance(data, list):
-                logger.info(f"🔍 DEBUG: List length: {len(data)}")
-                if len(data) > 0:
-                    logger.info(f"🔍 DEBUG: First item keys: {list(data[0].keys()) if isinstance(data[0], dict) else 'Not a dict'}")
-                    logger.info(f"🔍 DEBUG: First item sample: {str(data[0])[:200]}")
-            
-            strike_data = {}
-            
-            # Parse response (handle both list and dict formats)
-            if isinstance(data, list):
-                for item in data:
-                    strike = item.get('strike_price') or item.get('strike')
-                    if not strike:
-                        continue
-                    
-                    strike = float(strike)
-                    if strike < min_strike or strike > max_strike:
-                        continue
-                    
-                    ce_data = item.get('call_options', {}) or item.get('CE', {})
-                    pe_data = item.get('put_options', {}) or item.get('PE', {})
-                    
-                    # DEBUG: Log first strike structure
-                    if len(strike_data) == 0:
-                        logger.info(f"🔍 DEBUG: CE data keys: {list(ce_data.keys()) if ce_data else 'Empty'}")
-                        logger.info(f"🔍 DEBUG: PE data keys: {list(pe_data.keys()) if pe_data else 'Empty'}")
-                        logger.info(f"🔍 DEBUG: CE sample: {str(ce_data)[:200]}")
-                    
-                    # Extract from nested market_data object
-                    ce_market = ce_data.get('market_data', {})
-                    pe_market = pe_data.get('market_data', {})
-                    
-                    strike_data[strike] = {
-                        'ce_oi': float(ce_market.get('oi') or 0),
-                        'pe_oi': float(pe_market.get('oi') or 0),
-                        'ce_vol': float(ce_market.get('volume') or 0),
-                        'pe_vol': float(pe_market.get('volume') or 0),
-                        'ce_ltp': float(ce_market.get('ltp') or 0),
-                        'pe_ltp': float(pe_market.get('ltp') or 0)
-                    }
-            
-            elif isinstance(data, dict):
-                for key, item in data.items():
-                    strike = item.get('strike_price') or item.get('strike')
-                    if not strike:
-                        continue
-                    
-                    strike = float(strike)
-                    if strike < min_strike or strike > max_strike:
-                        continue
-                    
-                    ce_data = item.get('call_options', {}) or item.get('CE', {})
-                    pe_data = item.get('put_options', {}) or item.get('PE', {})
-                    
-                    # DEBUG: Log first strike structure
-                    if len(strike_data) == 0:
-                        logger.info(f"🔍 DEBUG: CE data keys: {list(ce_data.keys()) if ce_data else 'Empty'}")
-                        logger.info(f"🔍 DEBUG: PE data keys: {list(pe_data.keys()) if pe_data else 'Empty'}")
-                    
-                    # Extract from nested market_data object
-                    ce_market = ce_data.get('market_data', {})
-                    pe_market = pe_data.get('market_data', {})
-                    
-                    strike_data[strike] = {
-                        'ce_oi': float(ce_market.get('oi') or 0),
-                        'pe_oi': float(pe_market.get('oi') or 0),
-                        'ce_vol': float(ce_market.get('volume') or 0),
-                        'pe_vol': float(pe_market.get('volume') or 0),
-                        'ce_ltp': float(ce_market.get('ltp') or 0),
-                        'pe_ltp': float(pe_market.get('ltp') or 0)
-                    }
-            
-            if not strike_data:
+            # Response structure dump - only formatted when DEBUG is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"🔍 DEBUG: Response type: {type(data)}")
+                if isinstance(data, dict):
+                    logger.debug(f"🔍 DEBUG: Top-level keys: {list(data.keys())[:5]}")
+                elif isinstance(data, list):
+                    logger.debug(f"🔍 DEBUG: List length: {len(data)}")
+                    if len(data) > 0:
+                        logger.debug(f"🔍 DEBUG: First item keys: {list(data[0].keys()) if isinstance(data[0], dict) else 'Not a dict'}")
+                        logger.debug(f"🔍 DEBUG: First item sample: {str(data[0])[:200]}")
+            
+            # Parse response (list or dict of strikes) in one vectorized pass
+            rows = list(data.values()) if isinstance(data, dict) else data
+            if MSGSPEC_AVAILABLE and rows and isinstance(rows[0], _ChainEntry):
+                chain = self._parse_chain_entries(rows, min_strike, max_strike)
+            else:
+                chain = self._parse_option_chain(rows, min_strike, max_strike)
+            
+            if chain.empty:
                 logger.error("❌ No strikes parsed!")
                 return None
             
-            total_oi = sum(d['ce_oi'] + d['pe_oi'] for d in strike_data.values())
+            # Structure-of-arrays from here on - one typed array per field
+            book = StrikeBook.from_frame(chain)
+            
+            total_oi = int(book.ce_oi.sum() + book.pe_oi.sum())
             if total_oi == 0:
                 logger.error("❌ ALL OI VALUES ARE ZERO!")
-                logger.error(f"🔍 DEBUG: Strike data sample: {list(strike_data.items())[:2]}")
+                logger.error(f"🔍 DEBUG: Strike data sample: {chain.head(2).to_dict(orient='records')}")
                 return None
             
-            logger.info(f"✅ Parsed {len(strike_data)} strikes (Total OI: {total_oi:,.0f})")
+            logger.info(f"✅ Parsed {len(book)} strikes (Total OI: {total_oi:,.0f})")
             
-            return atm, strike_data
+            return atm, book
         
         except Exception as e:
             logger.error(f"❌ Option chain error: {e}", exc_info=True)
@@ -6,10 +6,17 @@ Live futures price for entry/exit, proper startup notification
 
 import asyncio
 from datetime import datetime
+from string import Template
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 from config import *
 from utils import *
-from data_manager import UpstoxClient, RedisBrain, DataFetcher
+from data_manager import UpstoxClient, RedisBrain, DataFetcher, close_session
 from analyzers import OIAnalyzer, VolumeAnalyzer, TechnicalAnalyzer, MarketAnalyzer
 from signal_engine import SignalGenerator, SignalValidator
 from position_tracker import PositionTracker
@@ -17,73 +24,27 @@ from alerts import TelegramBot, MessageFormatter
 
 BOT_VERSION = "4.0.0-FINAL"
 
-logger = setup_logger("main")
 
+# Startup notification - config values are baked in once at import, so
+# initialize() only substitutes the detected contracts, expiries and start time
+_EXAMPLE_ATM = 24150
+_DEEP_STRIKES = get_deep_analysis_strikes(_EXAMPLE_ATM)
+_FETCH_MIN, _FETCH_MAX = get_strike_range_fetch(_EXAMPLE_ATM)
 
-class NiftyTradingBot:
-    """Main bot orchestrator - PRODUCTION READY"""
-    
-    def __init__(self):
-        self.memory = RedisBrain()
-        self.upstox = None
-        self.data_fetcher = None
-        
-        self.oi_analyzer = OIAnalyzer()
-        self.volume_analyzer = VolumeAnalyzer()
-        self.technical_analyzer = TechnicalAnalyzer()
-        self.market_analyzer = MarketAnalyzer()
-        
-        self.signal_gen = SignalGenerator()
-        self.signal_validator = SignalValidator()
-        self.position_tracker = PositionTracker()
-        
-        self.telegram = TelegramBot()
-        self.formatter = MessageFormatter()
-        
-        self.previous_strike_data = None
-        self.exit_triggered_this_cycle = False
-    
-    async def initialize(self):
-        """Initialize bot with comprehensive startup notification"""
-        logger.info("=" * 60)
-        logger.info(f"🚀 NIFTY Trading Bot v{BOT_VERSION}")
-        logger.info("=" * 60)
-        
-        self.upstox = UpstoxClient()
-        await self.upstox.__aenter__()
-        
-        self.data_fetcher = DataFetcher(self.upstox)
-        
-        # Get contract details from ACTUAL auto-detection
-        weekly_expiry = get_next_weekly_expiry()
-        
-        # Get actual detected futures info
-        monthly_expiry = self.upstox.futures_expiry.strftime('%Y-%m-%d') if self.upstox.futures_expiry else "AUTO"
-        futures_contract = self.upstox.futures_symbol if self.upstox.futures_symbol else "NIFTY FUTURES"
-        
-        current_time = format_time_ist(get_ist_time())
-        
-        # Calculate deep analysis strikes for display
-        example_atm = 24150
-        deep_strikes = get_deep_analysis_strikes(example_atm)
-        deep_range = f"{deep_strikes[0]}-{deep_strikes[-1]}"
-        
-        fetch_min, fetch_max = get_strike_range_fetch(example_atm)
-        
-        startup_msg = f"""
-🚀 <b>NIFTY BOT v{BOT_VERSION} STARTED</b>
+STARTUP_TEMPLATE = Template(Template("""
+🚀 <b>NIFTY BOT v${BOT_VERSION} STARTED</b>
 
 ━━━━━━━━━━━━━━━━━━━━
 📅 <b>CONTRACT DETAILS</b>
 ━━━━━━━━━━━━━━━━━━━━
 
 <b>Futures (MONTHLY):</b>
-• Contract: {futures_contract}
-• Expiry: {monthly_expiry}
+• Contract: ${futures_contract}
+• Expiry: ${monthly_expiry}
 • Usage: Technical analysis (VWAP, ATR, Volume)
 
 <b>Options (WEEKLY):</b>
-• Expiry: {weekly_expiry}
+• Expiry: ${weekly_expiry}
 • Usage: Trading instrument + OI analysis
 
 ━━━━━━━━━━━━━━━━━━━━
@@ -100,9 +61,9 @@ class NiftyTradingBot:
 
 <b>WEEKLY Option Chain:</b>
 ✅ Fetch: 11 strikes (ATM ± 5)
-   Range: {fetch_min} to {fetch_max}
+   Range: ${fetch_min} to ${fetch_max}
 ✅ Deep Analysis: 5 strikes (ATM ± 2)
-   Range: {deep_range}
+   Range: ${deep_range}
 ✅ Total OI: All 11 strikes
 ✅ Unwinding Analysis: 5 deep strikes
 
@@ -115,63 +76,134 @@ class NiftyTradingBot:
 • Early Signals: 9:21 AM (confidence ≥ 85%)
 • Full Signals: 9:31 AM (confidence ≥ 70%)
 • Signal Window: 9:21 AM - 3:15 PM
-• Warmup Period: {WARMUP_MINUTES} min from first snapshot
-• Scan Interval: {SCAN_INTERVAL}s
-• Memory TTL: {MEMORY_TTL_HOURS}h (auto-cleanup)
+• Warmup Period: ${WARMUP_MINUTES} min from first snapshot
+• Scan Interval: ${SCAN_INTERVAL}s
+• Memory TTL: ${MEMORY_TTL_HOURS}h (auto-cleanup)
 
 ━━━━━━━━━━━━━━━━━━━━
 ⚙️ <b>OI THRESHOLDS (STRICT)</b>
 ━━━━━━━━━━━━━━━━━━━━
 
 <b>Entry Requirements (AND Logic):</b>
-• 5m OI Unwinding: &lt; -{MIN_OI_5M_FOR_ENTRY}%
-• 15m OI Unwinding: &lt; -{MIN_OI_15M_FOR_ENTRY}%
+• 5m OI Unwinding: &lt; -${MIN_OI_5M_FOR_ENTRY}%
+• 15m OI Unwinding: &lt; -${MIN_OI_15M_FOR_ENTRY}%
 • BOTH timeframes must show unwinding
-• ATM OI Threshold: &lt; -{ATM_OI_THRESHOLD}%
-• Volume Spike: ≥ {VOL_SPIKE_MULTIPLIER}x average
+• ATM OI Threshold: &lt; -${ATM_OI_THRESHOLD}%
+• Volume Spike: ≥ ${VOL_SPIKE_MULTIPLIER}x average
 
 <b>Strong Signal:</b>
-• 5m OI: &lt; -{STRONG_OI_5M_THRESHOLD}%
-• 15m OI: &lt; -{STRONG_OI_15M_THRESHOLD}%
+• 5m OI: &lt; -${STRONG_OI_5M_THRESHOLD}%
+• 15m OI: &lt; -${STRONG_OI_15M_THRESHOLD}%
 
 ━━━━━━━━━━━━━━━━━━━━
 🎯 <b>RISK MANAGEMENT</b>
 ━━━━━━━━━━━━━━━━━━━━
 
-• Premium SL: {PREMIUM_SL_PERCENT}%
-• Trailing SL: {'Enabled' if ENABLE_TRAILING_SL else 'Disabled'}
-• Trailing Distance: {int(TRAILING_SL_DISTANCE * 100)}%
-• Signal Cooldown: {SIGNAL_COOLDOWN_SECONDS}s
-• Min Confidence: {MIN_CONFIDENCE}%
-• Min Primary Checks: {MIN_PRIMARY_CHECKS}/3
+• Premium SL: ${PREMIUM_SL_PERCENT}%
+• Trailing SL: ${TRAILING_SL}
+• Trailing Distance: ${TRAILING_SL_DISTANCE_PCT}%
+• Signal Cooldown: ${SIGNAL_COOLDOWN_SECONDS}s
+• Min Confidence: ${MIN_CONFIDENCE}%
+• Min Primary Checks: ${MIN_PRIMARY_CHECKS}/3
 
 <b>Exit Protection:</b>
-• Min Hold Time: {MIN_HOLD_TIME_MINUTES} min
-• OI Exit Hold: {MIN_HOLD_BEFORE_OI_EXIT} min
-• OI Reversal: {EXIT_OI_REVERSAL_THRESHOLD}% sustained
-• Volume Dry: &lt; {EXIT_VOLUME_DRY_THRESHOLD}x
-• Premium Drop: {EXIT_PREMIUM_DROP_PERCENT}% from peak
+• Min Hold Time: ${MIN_HOLD_TIME_MINUTES} min
+• OI Exit Hold: ${MIN_HOLD_BEFORE_OI_EXIT} min
+• OI Reversal: ${EXIT_OI_REVERSAL_THRESHOLD}% sustained
+• Volume Dry: &lt; ${EXIT_VOLUME_DRY_THRESHOLD}x
+• Premium Drop: ${EXIT_PREMIUM_DROP_PERCENT}% from peak
 
 <b>Re-Entry Protection:</b>
-• Same Strike Cooldown: {SAME_STRIKE_COOLDOWN_MINUTES} min
-• Opposite Signal Gap: {OPPOSITE_SIGNAL_COOLDOWN_MINUTES} min
-• Same Direction Gap: {SAME_DIRECTION_COOLDOWN_MINUTES} min
+• Same Strike Cooldown: ${SAME_STRIKE_COOLDOWN_MINUTES} min
+• Opposite Signal Gap: ${OPPOSITE_SIGNAL_COOLDOWN_MINUTES} min
+• Same Direction Gap: ${SAME_DIRECTION_COOLDOWN_MINUTES} min
 
 ━━━━━━━━━━━━━━━━━━━━
 📈 <b>TECHNICAL SETTINGS</b>
 ━━━━━━━━━━━━━━━━━━━━
 
-• ATR Period: {ATR_PERIOD}
-• ATR Target Multiple: {ATR_TARGET_MULTIPLIER}x
-• ATR SL Multiple: {ATR_SL_MULTIPLIER}x
-• VWAP Buffer: {VWAP_BUFFER} pts
-• VWAP Strict Mode: {'ON' if VWAP_STRICT_MODE else 'OFF'}
-• PCR Bullish: &gt; {PCR_BULLISH}
-• PCR Bearish: &lt; {PCR_BEARISH}
+• ATR Period: ${ATR_PERIOD}
+• ATR Target Multiple: ${ATR_TARGET_MULTIPLIER}x
+• ATR SL Multiple: ${ATR_SL_MULTIPLIER}x
+• VWAP Buffer: ${VWAP_BUFFER} pts
+• VWAP Strict Mode: ${VWAP_STRICT}
+• PCR Bullish: &gt; ${PCR_BULLISH}
+• PCR Bearish: &lt; ${PCR_BEARISH}
 
 ━━━━━━━━━━━━━━━━━━━━
-⏰ Bot started at {current_time}
-"""
+⏰ Bot started at ${current_time}
+""").safe_substitute(
+    globals(),
+    BOT_VERSION=BOT_VERSION,
+    fetch_min=_FETCH_MIN,
+    fetch_max=_FETCH_MAX,
+    deep_range=f"{_DEEP_STRIKES[0]}-{_DEEP_STRIKES[-1]}",
+    TRAILING_SL='Enabled' if ENABLE_TRAILING_SL else 'Disabled',
+    TRAILING_SL_DISTANCE_PCT=int(TRAILING_SL_DISTANCE * 100),
+    VWAP_STRICT='ON' if VWAP_STRICT_MODE else 'OFF'
+))
+
+logger = setup_logger("main")
+
+
+class NiftyTradingBot:
+    """Main bot orchestrator - PRODUCTION READY"""
+    
+    def __init__(self):
+        self.memory = RedisBrain()
+        self.upstox = None
+        self.data_fetcher = None
+        
+        self.oi_analyzer = OIAnalyzer()
+        self.volume_analyzer = VolumeAnalyzer()
+        self.technical_analyzer = TechnicalAnalyzer()
+        self.market_analyzer = MarketAnalyzer()
+        
+        self.signal_gen = SignalGenerator()
+        self.signal_validator = SignalValidator()
+        self.position_tracker = PositionTracker()
+        
+        self.telegram = TelegramBot()
+        self.formatter = MessageFormatter()
+        
+        self.previous_book = None
+        self.exit_triggered_this_cycle = False
+    
+    async def initialize(self):
+        """Initialize bot with comprehensive startup notification"""
+        logger.info("=" * 60)
+        logger.info(f"🚀 NIFTY Trading Bot v{BOT_VERSION}")
+        logger.info("=" * 60)
+        
+        await self.memory.connect()
+        
+        self.upstox = UpstoxClient()
+        await self.upstox.__aenter__()
+        
+        self.data_fetcher = DataFetcher(self.upstox)
+        
+        # Get contract details from ACTUAL auto-detection
+        weekly_expiry = get_next_weekly_expiry()
+        
+        # Get actual detected futures info
+        monthly_expiry = self.upstox.futures_expiry.strftime('%Y-%m-%d') if self.upstox.futures_expiry else "AUTO"
+        futures_contract = self.upstox.futures_symbol if self.upstox.futures_symbol else "NIFTY FUTURES"
+        
+        current_time = format_time_ist(get_ist_time())
+        
+        startup_ctx = {
+            'version': BOT_VERSION,
+            'futures_contract': futures_contract,
+            'monthly_expiry': monthly_expiry,
+            'weekly_expiry': weekly_expiry,
+            'current_time': current_time
+        }
+        
+        # Compact summary by default; the full config dump with BOT_STARTUP_VERBOSE
+        if BOT_STARTUP_VERBOSE:
+            startup_msg = STARTUP_TEMPLATE.substitute(startup_ctx)
+        else:
+            startup_msg = self.formatter.format_startup_compact(startup_ctx)
         
         if self.telegram.is_enabled():
             await self.telegram.send(startup_msg)
@@ -189,6 +221,10 @@ class NiftyTradingBot:
         
         if self.upstox:
             await self.upstox.__aexit__(None, None, None)
+        await close_session()
+        
+        await self.memory.close()
+        await self.telegram.close()
         
         logger.info("✅ Shutdown complete")
     
@@ -212,6 +248,14 @@ class NiftyTradingBot:
         finally:
             await self.shutdown()
     
+    @staticmethod
+    def _strike_change(changes, index):
+        """One strike's (ce %, pe %, has_data) out of get_strikes_oi_change arrays"""
+        ce_chg, pe_chg, has = changes
+        if index < 0 or not has[index]:
+            return 0.0, 0.0, False
+        return float(ce_chg[index]), float(pe_chg[index]), True
+    
     async def _cycle(self):
         """Single scan cycle"""
         now = get_ist_time()
@@ -241,46 +285,45 @@ class NiftyTradingBot:
         
         # ========== STEP 1: FETCH ALL DATA ==========
         
-        # Fetch spot (for ATM calculation)
-        spot = await self.data_fetcher.fetch_spot()
+        # Spot (ATM), candles (technical analysis), LIVE futures price (entry/exit)
+        # and the WEEKLY option chain - concurrent, chain keyed off last cycle's spot
+        spot, futures_candles, futures_ltp, option_result = await self.data_fetcher.fetch_all()
         if not validate_price(spot):
             logger.error("❌ STOP: Spot validation failed")
             return
         logger.info(f"  ✅ Spot: ₹{spot:.2f}")
         
-        # Fetch MONTHLY futures candles (for technical analysis)
-        futures_df = await self.data_fetcher.fetch_futures_candles()
-        if not validate_candle_data(futures_df):
+        # MONTHLY futures candles (for technical analysis)
+        if not validate_candle_data(futures_candles):
             logger.error("❌ STOP: Futures candles validation failed")
             return
-        logger.info(f"  ✅ Futures Candles: {len(futures_df)} bars (for VWAP/ATR)")
+        logger.info(f"  ✅ Futures Candles: {len(futures_candles)} bars (for VWAP/ATR)")
         
-        # Fetch MONTHLY futures LIVE price (for entry/exit)
-        futures_ltp = await self.data_fetcher.fetch_futures_ltp()
+        # MONTHLY futures LIVE price (for entry/exit)
         if not validate_price(futures_ltp):
             logger.error("❌ STOP: Live Futures price validation failed")
             return
         logger.info(f"  ✅ Futures LIVE: ₹{futures_ltp:.2f} (REAL-TIME)")
         
         # Compare candle close vs live price
-        candle_close = futures_df['close'].iloc[-1]
+        candle_close = futures_candles['close'][-1]
         price_diff = futures_ltp - candle_close
         logger.info(f"  📊 Price Check: Candle={candle_close:.2f}, Live={futures_ltp:.2f}, Diff={price_diff:+.2f}")
         
-        # Fetch WEEKLY option chain (11 strikes)
-        option_result = await self.data_fetcher.fetch_option_chain(spot)
+        # WEEKLY option chain (11 strikes)
         if not option_result:
             logger.error("❌ STOP: Option chain returned None")
             return
         
-        atm, strike_data = option_result
-        if not validate_strike_data(strike_data):
+        # Chain as parallel arrays - built once, shared by all analyzers
+        atm, book = option_result
+        if not validate_strike_data(book):
             logger.error(f"❌ STOP: Strike validation failed")
             return
         
         # Get deep analysis strikes
         deep_strikes = get_deep_analysis_strikes(atm)
-        logger.info(f"  ✅ Strikes: {len(strike_data)} total (ATM {atm})")
+        logger.info(f"  ✅ Strikes: {len(book)} total (ATM {atm})")
         logger.info(f"  🔍 Deep Analysis: {len(deep_strikes)} strikes {deep_strikes[0]}-{deep_strikes[-1]}")
         
         # Use LIVE price for all decisions
@@ -290,13 +333,17 @@ class NiftyTradingBot:
         # ========== STEP 2: SAVE OI SNAPSHOTS (ALL 11 STRIKES) ==========
         
         logger.info("🔄 Saving OI snapshots (11 strikes)...")
-        total_ce, total_pe = self.oi_analyzer.calculate_total_oi(strike_data)
-        deep_ce, deep_pe, _ = self.oi_analyzer.calculate_deep_analysis_oi(strike_data, atm)
         
+        # Totals, PCR and order flow in one pass over the chain
+        summary = self.oi_analyzer.summarize(book)
+        total_ce, total_pe = summary['ce_oi'], summary['pe_oi']
+        deep_ce, deep_pe, _ = self.oi_analyzer.calculate_deep_analysis_oi(book, atm)
+        
+        # One clock read per scan - every snapshot save / lookup uses this minute
+        self.memory.begin_cycle()
         self.memory.save_total_oi(total_ce, total_pe)
         
-        for strike, data in strike_data.items():
-            self.memory.save_strike(strike, data)
+        self.memory.save_strikes(book)
         
         logger.info(f"  ✅ Total OI (11 strikes): CE={total_ce:,.0f}, PE={total_pe:,.0f}")
         logger.info(f"  🔍 Deep OI (5 strikes): CE={deep_ce:,.0f}, PE={deep_pe:,.0f}")
@@ -305,18 +352,32 @@ class NiftyTradingBot:
         
         logger.info("📊 Calculating OI changes...")
         
-        ce_5m, pe_5m, has_5m = self.memory.get_total_oi_change(total_ce, total_pe, 5)
-        ce_15m, pe_15m, has_15m = self.memory.get_total_oi_change(total_ce, total_pe, 15)
-        
         atm_info = self.oi_analyzer.get_atm_oi_changes(
-            strike_data, 
+            book, 
             atm, 
-            self.previous_strike_data
+            self.previous_book
+        )
+        
+        # Independent snapshot lookups (and the warmup probes) - run concurrently
+        # over the Redis pool; strike changes come back vectorized for the whole book
+        (
+            (ce_5m, pe_5m, has_5m),
+            (ce_15m, pe_15m, has_15m),
+            strikes_5m,
+            strikes_15m,
+            stats
+        ) = await asyncio.gather(
+            self.memory.get_total_oi_change(total_ce, total_pe, 5),
+            self.memory.get_total_oi_change(total_ce, total_pe, 15),
+            self.memory.get_strikes_oi_change(book, 5),
+            self.memory.get_strikes_oi_change(book, 15),
+            self.memory.get_stats()
         )
         
-        atm_data = self.oi_analyzer.get_atm_data(strike_data, atm)
-        atm_ce_5m, atm_pe_5m, has_atm_5m = self.memory.get_strike_oi_change(atm, atm_data, 5)
-        atm_ce_15m, atm_pe_15m, has_atm_15m = self.memory.get_strike_oi_change(atm, atm_data, 15)
+        atm_data = self.oi_analyzer.get_atm_data(book, atm)
+        atm_index = book.index_of(atm)
+        atm_ce_5m, atm_pe_5m, has_atm_5m = self._strike_change(strikes_5m, atm_index)
+        atm_ce_15m, atm_pe_15m, has_atm_15m = self._strike_change(strikes_15m, atm_index)
         
         if not atm_info['has_previous_data']:
             atm_info['ce_change_pct'] = atm_ce_15m
@@ -326,24 +387,49 @@ class NiftyTradingBot:
         logger.info(f"  15m: CE={ce_15m:+.1f}% PE={pe_15m:+.1f}% {'✅' if has_15m else '⏳'}")
         logger.info(f"  ATM {atm}: CE={atm_info['ce_change_pct']:+.1f}% PE={atm_info['pe_change_pct']:+.1f}%")
         
-        self.previous_strike_data = strike_data.copy()
+        # Book is never mutated after construction - no copy needed
+        self.previous_book = book
         
-        # ========== STEP 4: RUN ANALYSIS ==========
+        # ========== STEP 4: CHECK WARMUP ==========
+        
+        # Before any analysis - none of it is used until warmup completes
+        logger.info(f"\n⏱️  WARMUP STATUS:")
+        if stats['first_snapshot_time']:
+            logger.info(f"  Base Time: {stats['first_snapshot_time'].strftime('%H:%M')}")
+        logger.info(f"  Elapsed: {stats['elapsed_minutes']:.1f} min")
+        logger.info(f"  5m Ready: {'✅' if stats['warmed_up_5m'] else '⏳'}")
+        logger.info(f"  10m Ready: {'✅' if stats['warmed_up_10m'] else '⏳'}")
+        logger.info(f"  15m Ready: {'✅' if stats['warmed_up_15m'] else '⏳'}")
+        
+        full_warmup = stats['warmed_up_15m']
+        early_warmup = stats['warmed_up_5m'] and stats['elapsed_minutes'] >= 5
+        
+        if not full_warmup and not early_warmup:
+            remaining = WARMUP_MINUTES - stats['elapsed_minutes']
+            logger.info(f"\n🚫 SIGNALS BLOCKED - Warmup: {remaining:.1f} min remaining")
+            return
+        
+        if full_warmup:
+            logger.info(f"\n✅ FULL WARMUP COMPLETE - All signals active!")
+        else:
+            logger.info(f"\n⚡ EARLY WARMUP READY - High confidence signals only!")
+        
+        # ========== STEP 5: RUN ANALYSIS ==========
         
         logger.info("🔍 Running technical analysis...")
         
-        pcr = self.oi_analyzer.calculate_pcr(total_pe, total_ce)
-        vwap = self.technical_analyzer.calculate_vwap(futures_df)
-        atr = self.technical_analyzer.calculate_atr(futures_df)
+        pcr = summary['pcr']
+        vwap = self.technical_analyzer.calculate_vwap(futures_candles)
+        atr = self.technical_analyzer.calculate_atr(futures_candles)
         vwap_dist = self.technical_analyzer.calculate_vwap_distance(futures_price, vwap) if vwap else 0
-        candle = self.technical_analyzer.analyze_candle(futures_df)
-        momentum = self.technical_analyzer.detect_momentum(futures_df)
+        candle = self.technical_analyzer.analyze_candle(futures_candles)
+        momentum = self.technical_analyzer.detect_momentum(futures_candles)
         
-        vol_trend = self.volume_analyzer.analyze_volume_trend(futures_df)
+        vol_trend = self.volume_analyzer.analyze_volume_trend(futures_candles)
         vol_spike, vol_ratio = self.volume_analyzer.detect_volume_spike(
             vol_trend['current_volume'], vol_trend['avg_volume']
         )
-        order_flow = self.volume_analyzer.calculate_order_flow(strike_data)
+        order_flow = summary['order_flow']
         
         gamma = self.market_analyzer.detect_gamma_zone()
         unwinding = self.oi_analyzer.detect_unwinding(ce_5m, ce_15m, pe_5m, pe_15m)
@@ -365,30 +451,6 @@ class NiftyTradingBot:
         logger.info(f"  💨 Flow: {order_flow:.2f}, Momentum: {momentum['direction']}")
         logger.info(f"  🎯 Gamma Zone: {gamma}")
         
-        # ========== STEP 5: CHECK WARMUP ==========
-        
-        stats = self.memory.get_stats()
-        logger.info(f"\n⏱️  WARMUP STATUS:")
-        if stats['first_snapshot_time']:
-            logger.info(f"  Base Time: {stats['first_snapshot_time'].strftime('%H:%M')}")
-        logger.info(f"  Elapsed: {stats['elapsed_minutes']:.1f} min")
-        logger.info(f"  5m Ready: {'✅' if stats['warmed_up_5m'] else '⏳'}")
-        logger.info(f"  10m Ready: {'✅' if stats['warmed_up_10m'] else '⏳'}")
-        logger.info(f"  15m Ready: {'✅' if stats['warmed_up_15m'] else '⏳'}")
-        
-        full_warmup = stats['warmed_up_15m']
-        early_warmup = stats['warmed_up_5m'] and stats['elapsed_minutes'] >= 5
-        
-        if not full_warmup and not early_warmup:
-            remaining = WARMUP_MINUTES - stats['elapsed_minutes']
-            logger.info(f"\n🚫 SIGNALS BLOCKED - Warmup: {remaining:.1f} min remaining")
-            return
-        
-        if full_warmup:
-            logger.info(f"\n✅ FULL WARMUP COMPLETE - All signals active!")
-        else:
-            logger.info(f"\n⚡ EARLY WARMUP READY - High confidence signals only!")
-        
         # ========== STEP 6: CHECK EXIT CONDITIONS ==========
         
         if self.position_tracker.has_active_position():
@@ -425,12 +487,11 @@ class NiftyTradingBot:
                     
                     self.position_tracker.close_position(reason, details, exit_premium)
                     
-                    if self.telegram.is_enabled():
-                        msg = self.formatter.format_exit_signal(
-                            self.position_tracker.closed_positions[-1],
-                            reason, details
-                        )
-                        await self.telegram.send_exit(msg)
+                    # Formatted only if Telegram is enabled
+                    await self.telegram.send_exit(lambda: self.formatter.format_exit_signal(
+                        self.position_tracker.closed_positions[-1],
+                        reason, details
+                    ))
                     
                     logger.info(f"🚪 EXIT TRIGGERED: {reason} - {details}")
                     self.exit_triggered_this_cycle = True
@@ -499,11 +560,11 @@ class NiftyTradingBot:
                 
                 self.position_tracker.open_position(validated)
                 
-                if self.telegram.is_enabled():
-                    msg = self.formatter.format_entry_signal(validated)
-                    if not full_warmup:
-                        msg = f"⚡ <b>EARLY SIGNAL</b> (High Confidence)\n\n" + msg
-                    await self.telegram.send_signal(msg)
+                # Formatted only if Telegram is enabled
+                prefix = "" if full_warmup else "⚡ <b>EARLY SIGNAL</b> (High Confidence)\n\n"
+                await self.telegram.send_signal(
+                    lambda: prefix + self.formatter.format_entry_signal(validated)
+                )
             else:
                 logger.info(f"  ✋ No valid setup found")
         elif not signal_allowed:
@@ -518,4 +579,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # libuv-based loop for the HTTP polling path (optional, not on Windows)
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -7,6 +7,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
+
 from config import *
 from utils import IST, setup_logger
 from signal_engine import Signal, SignalType
@@ -29,12 +31,23 @@ class Position:
     exit_reason: Optional[str] = None
     exit_premium: Optional[float] = None
     
-    # Track OI history for exit logic
-    oi_history: list = None
+    # Track OI history for exit logic (fixed-size buffer, newest last)
+    oi_history: np.ndarray = None
+    oi_count: int = 0
     
     def __post_init__(self):
         if self.oi_history is None:
-            self.oi_history = []
+            self.oi_history = np.zeros(EXIT_OI_HISTORY_LENGTH, dtype=np.float64)
+    
+    def record_oi(self, value):
+        """Push latest OI change into the buffer (oldest one drops off)"""
+        self.oi_history[:-1] = self.oi_history[1:]
+        self.oi_history[-1] = value
+        self.oi_count = min(self.oi_count + 1, len(self.oi_history))
+    
+    def get_oi_history(self):
+        """View of the recorded OI changes, oldest first"""
+        return self.oi_history[len(self.oi_history) - self.oi_count:]
     
     def get_profit_loss(self):
         """Calculate P&L"""
@@ -73,8 +86,7 @@ class PositionTracker:
             entry_time=datetime.now(IST),
             entry_premium=signal.option_premium,
             highest_premium=signal.option_premium,
-            trailing_sl=signal.premium_sl if USE_PREMIUM_SL else 0,
-            oi_history=[]
+            trailing_sl=signal.premium_sl if USE_PREMIUM_SL else 0
         )
         
         self.active_position = position
@@ -150,22 +162,17 @@ class PositionTracker:
         
         # EXIT 4: OI Reversal (SUSTAINED CHECK)
         if hold_time >= MIN_HOLD_BEFORE_OI_EXIT:
-            # Track OI changes
+            # Track OI changes (buffer keeps last EXIT_OI_HISTORY_LENGTH candles)
             if signal.signal_type == SignalType.CE_BUY:
-                ce_oi = current_data.get('ce_oi_5m', 0)
-                position.oi_history.append(ce_oi)
+                position.record_oi(current_data.get('ce_oi_5m', 0))
             else:  # PE_BUY
-                pe_oi = current_data.get('pe_oi_5m', 0)
-                position.oi_history.append(pe_oi)
-            
-            # Keep only last 5 candles
-            position.oi_history = position.oi_history[-5:]
+                position.record_oi(current_data.get('pe_oi_5m', 0))
             
             # Check sustained reversal
             signal_type_str = 'CE' if signal.signal_type == SignalType.CE_BUY else 'PE'
             is_reversal, strength, avg, message = OIAnalyzer.check_oi_reversal(
                 signal_type_str,
-                position.oi_history,
+                position.get_oi_history(),
                 EXIT_OI_REVERSAL_THRESHOLD
             )
             
@@ -102,52 +102,28 @@ def validate_price(price):
         return False
     return True
 
-def validate_strike_data(strike_data, min_strikes=7):
+def validate_strike_data(book, min_strikes=7):
     """
-    Validate option chain data - need at least 7 strikes for safety
+    Validate option chain data (StrikeBook) - need at least 7 strikes for safety
+    Columns are typed numeric arrays, so only size and OI presence are checked
     """
-    if not strike_data or not isinstance(strike_data, dict):
+    if book is None or len(book) < min_strikes:
         return False
     
-    if len(strike_data) < min_strikes:
-        return False
-    
-    # Check structure
-    for strike, data in strike_data.items():
-        # Accept int or float strikes
-        if not isinstance(strike, (int, float)):
-            return False
-        
-        if not isinstance(data, dict):
-            return False
-        
-        # Check required fields
-        required = ['ce_oi', 'pe_oi', 'ce_vol', 'pe_vol']
-        if not all(f in data for f in required):
-            return False
-        
-        # Check if values are numeric
-        for field in required:
-            if not isinstance(data[field], (int, float)):
-                return False
-    
     # Check if at least some OI exists
-    total_oi = sum(d['ce_oi'] + d['pe_oi'] for d in strike_data.values())
-    if total_oi == 0:
+    if book.ce_oi.sum() + book.pe_oi.sum() == 0:
         return False
     
     return True
 
-def validate_candle_data(df, min_candles=10):
-    """Validate futures candle data"""
-    if df is None or df.empty:
-        return False
-    
-    if len(df) < min_candles:
+def validate_candle_data(candles, min_candles=10):
+    """Validate futures candle data (structured array)"""
+    if candles is None or len(candles) < min_candles:
         return False
     
     required = ['close', 'high', 'low', 'volume']
-    if not all(col in df.columns for col in required):
+    names = candles.dtype.names or ()
+    if not all(col in names for col in required):
         return False
     
     return True